@@ -0,0 +1,78 @@
+# activity_tracker.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """Coalesces `last_active` touches in memory and writes them in bulk.
+
+    A user is written at most once per `min_interval` seconds; pending touches
+    are flushed every `flush_interval` seconds as a single unordered bulk_write.
+    """
+
+    def __init__(self, collection, flush_interval: float = 10.0, min_interval: float = 60.0):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.min_interval = min_interval
+        self._pending: Dict[str, datetime] = {}
+        self._last_written: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def touch(self, user_id: str, when: Optional[datetime] = None):
+        last = self._last_written.get(user_id)
+        if last is not None and time.monotonic() - last < self.min_interval:
+            return
+        self._pending[user_id] = when or datetime.utcnow()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        granularity = timedelta(seconds=self.min_interval)
+        ops = [
+            # условие на last_active отсекает запись, если другой воркер уже обновил пользователя
+            UpdateOne({"id": user_id, "last_active": {"$lt": ts - granularity}}, {"$set": {"last_active": ts}})
+            for user_id, ts in pending.items()
+        ]
+        try:
+            await self.collection.bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to flush last_active for {len(ops)} users: {e}")
+            for user_id, ts in pending.items():
+                self._pending.setdefault(user_id, ts)
+            return 0
+        now = time.monotonic()
+        self._last_written = {
+            user_id: written_at
+            for user_id, written_at in self._last_written.items()
+            if now - written_at < self.min_interval
+        }
+        for user_id in pending:
+            self._last_written[user_id] = now
+        return len(ops)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -0,0 +1,166 @@
+# anonymous_ids.py
+import asyncio
+import hashlib
+import logging
+import secrets
+from typing import List, Tuple
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+ID_PREFIX = "Автор #"
+STATE_ID = "anonymous_ids"
+SEED_CHUNK = 10000
+FEISTEL_ROUNDS = 4
+
+
+class AnonymousIdsExhausted(RuntimeError):
+    pass
+
+
+def tier_range(tier: int) -> Tuple[int, int]:
+    # tier 0 — исторические "Автор #1".."Автор #9999", дальше по разряду на tier
+    if tier == 0:
+        return 1, 10000
+    return 10 ** (tier + 3), 10 ** (tier + 4)
+
+
+def tier_size(tier: int) -> int:
+    low, high = tier_range(tier)
+    return high - low
+
+
+def tier_offset(tier: int) -> int:
+    # _id пула = tier_offset(tier) + позиция в перемешанном порядке: tier'ы не пересекаются
+    return sum(tier_size(t) for t in range(tier))
+
+
+def permute(index: int, size: int, key: bytes) -> int:
+    """Keyed bijection of [0, size): a Feistel network over the nearest
+    even power of two, cycle-walking until the result falls in range."""
+    bits = max(2, (size - 1).bit_length())
+    half = (bits + 1) // 2
+    mask = (1 << half) - 1
+    value = index
+    while True:
+        left, right = value >> half, value & mask
+        for round_ in range(FEISTEL_ROUNDS):
+            digest = hashlib.blake2b(f"{round_}:{right}".encode(), key=key, digest_size=8).digest()
+            left, right = right, left ^ (int.from_bytes(digest, "big") & mask)
+        value = (left << half) | right
+        if value < size:
+            return value
+
+
+class AnonymousIdAllocator:
+    """Hands out display ids from a pre-shuffled pool of free numbers.
+
+    allocate() is a single find_one_and_delete on the pool's _id index: O(1)
+    round trips, atomic across workers, no retry loop. The pool holds one
+    chunk or so at a time: when it runs low, a worker claims the next
+    `chunk` positions of the current tier with $inc on anonymous_id_state
+    and inserts numbers for them, so no tier is ever materialised whole.
+    Positions map to numbers through a keyed permutation (one secret key
+    per tier), which keeps the order unpredictable; hashing runs in a
+    thread, off the event loop. A used-up tier advances to the next, wider
+    one by compare-and-set. Background refills go through `supervisor`
+    (a TaskSupervisor). The unique index on users.anonymous_id stays as
+    the final guard.
+    """
+
+    def __init__(self, db, supervisor, low_watermark: float = 0.1, check_every: int = 100, chunk: int = SEED_CHUNK):
+        self.pool = db.anonymous_id_pool
+        self.state = db.anonymous_id_state
+        self.users = db.users
+        self.low_watermark = low_watermark
+        self.check_every = check_every
+        self.chunk = chunk
+        self.supervisor = supervisor
+        self._allocated = 0
+        self._lock = asyncio.Lock()
+
+    async def allocate(self) -> str:
+        doc = await self.pool.find_one_and_delete({}, sort=[("_id", ASCENDING)])
+        if doc is None:
+            await self.refill()
+            doc = await self.pool.find_one_and_delete({}, sort=[("_id", ASCENDING)])
+            if doc is None:
+                raise AnonymousIdsExhausted("Anonymous id pool is empty")
+        self._allocated += 1
+        if self._allocated % self.check_every == 0:
+            # пока идёт пополнение, refill(low_only=True) сразу выходит; выброшенную из полной очереди
+            # проверку повторит следующий check_every
+            await self.supervisor.submit(self.refill, low_only=True)
+        return f"{ID_PREFIX}{doc['n']}"
+
+    async def refill(self, low_only: bool = False):
+        if self._lock.locked() and low_only:
+            return
+        async with self._lock:
+            while True:
+                free = await self.pool.estimated_document_count()
+                if free > (self.low_watermark * self.chunk if low_only else 0):
+                    return
+                tier, key, start, stop = await self._claim()
+                if await self._seed(tier, key, start, stop) > 0:
+                    return
+
+    async def _claim(self) -> Tuple[int, bytes, int, int]:
+        """Reserve the next positions [start, stop) of the current tier,
+        moving on to the next tier once this one is used up."""
+        while True:
+            state = await self.state.find_one_and_update(
+                {"_id": STATE_ID}, {"$inc": {"seeded": self.chunk}}, return_document=ReturnDocument.BEFORE
+            )
+            if state is None:
+                try:
+                    key = secrets.token_bytes(16)
+                    await self.state.insert_one({"_id": STATE_ID, "tier": 0, "key": key, "seeded": self.chunk})
+                    return 0, key, 0, min(self.chunk, tier_size(0))
+                except DuplicateKeyError:
+                    continue
+            tier, size = state["tier"], tier_size(state["tier"])
+            # состояние без key осталось от засева tier'а целиком: он уже весь в пуле
+            if "key" in state and state["seeded"] < size:
+                return tier, state["key"], state["seeded"], min(state["seeded"] + self.chunk, size)
+            key = secrets.token_bytes(16)
+            won = await self.state.find_one_and_update(
+                {"_id": STATE_ID, "tier": tier},
+                {"$set": {"tier": tier + 1, "key": key, "seeded": self.chunk}},
+            )
+            if won is not None:
+                return tier + 1, key, 0, min(self.chunk, tier_size(tier + 1))
+            # следующий tier открыл другой воркер — берём позиции уже из него
+
+    async def stats(self) -> dict:
+        state = await self.state.find_one({"_id": STATE_ID})
+        tier = state["tier"] if state else -1
+        capacity = sum(tier_size(t) for t in range(tier + 1))
+        unseeded = tier_size(tier) - min(state["seeded"], tier_size(tier)) if state and "key" in state else 0
+        free = await self.pool.estimated_document_count() + unseeded
+        return {
+            "tier": tier,
+            "capacity": capacity,
+            "free": free,
+            "used_ratio": round(1 - free / capacity, 4) if capacity else 0.0,
+        }
+
+    async def _seed(self, tier: int, key: bytes, start: int, stop: int) -> int:
+        low, _ = tier_range(tier)
+        size = tier_size(tier)
+        numbers: List[int] = await asyncio.to_thread(
+            lambda: [low + permute(position, size, key) for position in range(start, stop)]
+        )
+        docs = [{"_id": tier_offset(tier) + start + i, "n": n} for i, n in enumerate(numbers)]
+        if tier == 0:
+            # раньше номера выдавались случайно из этого же диапазона — их не выдаём повторно
+            taken = set(await self.users.distinct(
+                "anonymous_id", {"anonymous_id": {"$in": [f"{ID_PREFIX}{n}" for n in numbers]}}
+            ))
+            docs = [doc for doc in docs if f"{ID_PREFIX}{doc['n']}" not in taken]
+        if docs:
+            await self.pool.insert_many(docs, ordered=False)
+        logger.info(f"Anonymous id tier {tier}: seeded positions {start}..{stop - 1} ({len(docs)} ids)")
+        return len(docs)
@@ -0,0 +1,18 @@
+# etags.py
+import hashlib
+from typing import Optional
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the fields that change whenever the representation does."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match сравнивается слабо (RFC 9110 13.1.2): W/ префикс игнорируется
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
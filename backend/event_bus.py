@@ -0,0 +1,132 @@
+# event_bus.py
+import asyncio
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import aio_pika
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[dict], Union[None, Awaitable[None]]]
+
+
+class EventBus:
+    """Delivers application events ("message.created", "user.blocked", ...)
+    to the handlers subscribed in this process."""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, event_type: str, handler: Handler):
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def publish(self, event_type: str, data: dict):
+        await self._dispatch(event_type, data)
+
+    async def _dispatch(self, event_type: str, data: dict):
+        for handler in self._handlers.get(event_type, ()):
+            try:
+                result = handler(data)
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Event handler for {event_type} failed: {e}")
+
+
+class InMemoryEventBus(EventBus):
+    """Single-process bus: publish is a direct local dispatch."""
+
+
+class AmqpEventBus(EventBus):
+    """Fans events out to every worker through a RabbitMQ fanout exchange.
+
+    Handlers in the publishing process run immediately; the event is also
+    buffered and sent to the other workers in batches of up to `batch_size`
+    events or after `batch_delay` seconds, one broker message per batch.
+    Each worker consumes its own exclusive queue and skips its own batches.
+    """
+
+    def __init__(self, url: str, exchange: str = "cryptonite.events",
+                 batch_size: int = 100, batch_delay: float = 0.01):
+        super().__init__()
+        self.url = url
+        self.exchange_name = exchange
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.origin = uuid.uuid4().hex
+        self._buffer: List[dict] = []
+        self._pending = asyncio.Event()
+        self._connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self._exchange: Optional[aio_pika.abc.AbstractExchange] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._connection = await aio_pika.connect_robust(self.url)
+        channel = await self._connection.channel()
+        self._exchange = await channel.declare_exchange(self.exchange_name, aio_pika.ExchangeType.FANOUT)
+        queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await queue.bind(self._exchange)
+        await queue.consume(self._on_batch, no_ack=True)
+        self._flusher = asyncio.create_task(self._run_flusher())
+        logger.info(f"Event bus connected to exchange {self.exchange_name} as {self.origin}")
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def publish(self, event_type: str, data: dict):
+        await self._dispatch(event_type, data)
+        self._buffer.append({"type": event_type, "data": data})
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+        else:
+            self._pending.set()
+
+    async def flush(self):
+        if not self._buffer or self._exchange is None:
+            return
+        events, self._buffer = self._buffer, []
+        body = json.dumps({"origin": self.origin, "events": events}, ensure_ascii=False).encode()
+        try:
+            await self._exchange.publish(
+                aio_pika.Message(body, content_type="application/json"),
+                routing_key="",
+            )
+        except Exception as e:
+            # события — best effort: кэши других воркеров догонят по TTL
+            logger.error(f"Failed to publish {len(events)} events: {e}")
+
+    async def _run_flusher(self):
+        while True:
+            await self._pending.wait()
+            await asyncio.sleep(self.batch_delay)
+            self._pending.clear()
+            await self.flush()
+
+    async def _on_batch(self, message: aio_pika.abc.AbstractIncomingMessage):
+        try:
+            batch = json.loads(message.body)
+        except ValueError as e:
+            logger.error(f"Malformed event batch: {e}")
+            return
+        if batch.get("origin") == self.origin:
+            return
+        for event in batch.get("events", []):
+            await self._dispatch(event.get("type"), event.get("data") or {})
@@ -0,0 +1,66 @@
+# feed_cache.py
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class FeedCache:
+    """Short-lived cache of already-serialized feed pages.
+
+    Holds the response body and headers for the first `depth` items of the
+    feed, keyed by page. Any change to the feed (new post, blocked post)
+    drops everything via `invalidate`; a page that was being built while
+    the feed changed is not stored (generation check), so a slow query
+    can't put a stale page back after the invalidation.
+    """
+
+    def __init__(self, ttl: float = 5.0, depth: int = 100, maxsize: int = 64):
+        self.ttl = ttl
+        self.depth = depth
+        self.maxsize = maxsize
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # key -> (expires_at (monotonic), body, headers)
+        self._pages: "OrderedDict[Hashable, Tuple[float, bytes, Dict[str, str]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def cacheable(self, skip: int, limit: int) -> bool:
+        return self.ttl > 0 and self.maxsize > 0 and skip + limit <= self.depth
+
+    def get(self, key: Hashable) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        entry = self._pages.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._pages[key]
+            self.misses += 1
+            return None
+        self._pages.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, key: Hashable, generation: int, body: bytes, headers: Dict[str, str]):
+        if generation != self.generation:
+            return
+        self._pages[key] = (time.monotonic() + self.ttl, body, headers)
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.maxsize:
+            self._pages.popitem(last=False)
+
+    def invalidate(self):
+        self.generation += 1
+        self.invalidations += 1
+        self._pages.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "pages": len(self._pages),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
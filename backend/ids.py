@@ -0,0 +1,32 @@
+# ids.py
+import secrets
+import threading
+import time
+import uuid
+
+# UUIDv7 (RFC 9562): 48 бит unix-времени в мс, 12 бит счётчика, 62 бита случайности.
+# В Mongo хранится как BSON Binary subtype 4 (16 байт, uuidRepresentation="standard"),
+# в API отдаётся обычной строкой; байтовый порядок совпадает с порядком создания.
+
+_lock = threading.Lock()
+_last_ms = 0
+_seq = 0
+
+_VERSION = 0x7 << 76
+_VARIANT = 0b10 << 62
+
+
+def new_id() -> uuid.UUID:
+    global _last_ms, _seq
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _seq = secrets.randbits(10)  # запас под монотонный счётчик внутри миллисекунды
+        else:
+            _seq += 1
+            if _seq > 0xFFF:
+                _last_ms += 1
+                _seq = 0
+        ms, seq = _last_ms, _seq
+    return uuid.UUID(int=(ms & 0xFFFFFFFFFFFF) << 80 | _VERSION | seq << 64 | _VARIANT | secrets.randbits(62))
@@ -0,0 +1,125 @@
+# indexes.py
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+NOT_BLOCKED = {"is_blocked": False}
+
+# Индексы под каждую форму запроса из main.py
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="users_id", unique=True),
+        IndexModel([("anonymous_id", ASCENDING)], name="users_anonymous_id", unique=True),
+    ],
+    "posts": [
+        IndexModel([("id", ASCENDING)], name="posts_id", unique=True),
+        IndexModel(
+            [("created_at", DESCENDING), ("id", DESCENDING)],
+            name="posts_feed",
+            partialFilterExpression=NOT_BLOCKED,
+        ),
+        # лента по тегу: multikey, одна запись на тег поста
+        IndexModel(
+            [("tags", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="posts_by_tag",
+            partialFilterExpression=NOT_BLOCKED,
+        ),
+    ],
+    "tag_counts": [
+        IndexModel([("count", DESCENDING), ("_id", ASCENDING)], name="tag_counts_popular"),
+    ],
+    "comments": [
+        IndexModel([("id", ASCENDING)], name="comments_id", unique=True),
+        IndexModel(
+            [("post_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="comments_by_post",
+            partialFilterExpression=NOT_BLOCKED,
+        ),
+    ],
+    "chats": [
+        IndexModel([("id", ASCENDING)], name="chats_id", unique=True),
+        IndexModel([("participants", ASCENDING), ("last_message_at", DESCENDING)], name="chats_by_participant"),
+        # один активный чат на пару; старые чаты без pair_key в индекс не попадают
+        IndexModel(
+            [("pair_key", ASCENDING)],
+            name="chats_pair_key",
+            unique=True,
+            partialFilterExpression={"is_active": True, "pair_key": {"$exists": True}},
+        ),
+    ],
+    "messages": [
+        IndexModel([("id", ASCENDING)], name="messages_id", unique=True),
+        IndexModel([("chat_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)], name="messages_by_chat"),
+        # подсчёт непрочитанных: чужие сообщения между двумя отметками прочтения, только по индексу
+        IndexModel(
+            [("chat_id", ASCENDING), ("sender_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="messages_by_chat_sender",
+        ),
+    ],
+    # MESSAGE_STORAGE=buckets: запись в бакет чата ищется по first_created_at, страницы — по обоим концам
+    "message_buckets": [
+        IndexModel([("chat_id", ASCENDING), ("first_created_at", DESCENDING)], name="message_buckets_by_first"),
+        IndexModel([("chat_id", ASCENDING), ("last.created_at", DESCENDING)], name="message_buckets_by_last"),
+    ],
+    "message_archive": [
+        IndexModel([("chat_id", ASCENDING), ("first_created_at", DESCENDING)], name="message_archive_by_first"),
+        IndexModel([("chat_id", ASCENDING), ("last_created_at", ASCENDING)], name="message_archive_by_last"),
+    ],
+}
+
+
+class IndexManager:
+    """Declares INDEXES at startup and keeps a per-index build status.
+
+    create_indexes is a no-op for an identical existing index, so running
+    this on every start is safe; a changed spec under an old name is
+    reported as failed instead of being silently ignored.
+    """
+
+    def __init__(self, db, indexes: Dict[str, List[IndexModel]] = INDEXES):
+        self.db = db
+        self.indexes = indexes
+        self.status: Dict[str, str] = {
+            f"{collection}.{model.document['name']}": "pending"
+            for collection, models in indexes.items()
+            for model in models
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return all(state in ("created", "exists") for state in self.status.values())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.ensure())
+
+    async def ensure(self) -> Dict[str, str]:
+        for collection_name, models in self.indexes.items():
+            collection = self.db[collection_name]
+            try:
+                existing = await collection.index_information()
+            except PyMongoError as e:
+                logger.error(f"Cannot list indexes of {collection_name}: {e}")
+                existing = {}
+
+            for model in models:
+                name = model.document["name"]
+                key = f"{collection_name}.{name}"
+                self.status[key] = "building"
+                try:
+                    await collection.create_indexes([model])
+                    self.status[key] = "exists" if name in existing else "created"
+                except PyMongoError as e:
+                    self.status[key] = f"failed: {e}"
+                    logger.error(f"Index {key} failed: {e}")
+
+        created = sum(1 for state in self.status.values() if state == "created")
+        failed = sum(1 for state in self.status.values() if state.startswith("failed"))
+        logger.info(f"Indexes ensured: {len(self.status)} declared, {created} created, {failed} failed")
+        return self.status
@@ -0,0 +1,59 @@
+# latency.py
+import time
+from collections import deque
+from typing import Deque, Dict
+
+
+class LatencyRecorder:
+    """Per-endpoint request latencies over the last `window` requests."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self.counts: Dict[str, int] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, endpoint: str, seconds: float):
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def stats(self) -> dict:
+        result = {}
+        for endpoint, samples in sorted(self._samples.items()):
+            ordered = sorted(samples)
+            result[endpoint] = {
+                "count": self.counts[endpoint],
+                "avg_ms": round(sum(ordered) / len(ordered) * 1e3, 2),
+                "p50_ms": round(_percentile(ordered, 0.50) * 1e3, 2),
+                "p95_ms": round(_percentile(ordered, 0.95) * 1e3, 2),
+                "p99_ms": round(_percentile(ordered, 0.99) * 1e3, 2),
+                "max_ms": round(ordered[-1] * 1e3, 2),
+            }
+        return result
+
+
+def _percentile(ordered, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LatencyMiddleware:
+    """ASGI middleware timing HTTP requests by route template
+    ("POST /api/posts/{post_id}/comments"), not by concrete URL."""
+
+    def __init__(self, app, recorder: LatencyRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            if route is not None:
+                self.recorder.record(f"{scope['method']} {route.path}", time.perf_counter() - started)
@@ -0,0 +1,240 @@
+# message_archive.py
+import asyncio
+import logging
+import uuid
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import bson
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# блоки хранят uuid так же, как основная база (Binary subtype 4)
+CODEC_OPTIONS = CodecOptions(uuid_representation=UuidRepresentation.STANDARD)
+
+Position = Tuple[datetime, object]
+
+LEASE_ID = "message_archive"
+
+
+def position(message: dict) -> Position:
+    return message["created_at"], message["id"]
+
+
+class MessageArchive:
+    """Cold tier for chat messages.
+
+    Messages older than `max_age` are moved out of the hot `messages`
+    collection into per-chat blocks of up to `block_size` messages, stored
+    as one zlib-compressed BSON array per document. A block's _id is the id
+    of its first message, so re-archiving after a crash rewrites the same
+    block instead of duplicating it. Chats remember the newest archived
+    position in `archived_upto`, which lets readers skip the archive for
+    chats that never had anything archived.
+
+    A partial block is written only once its newest message is twice as
+    old as `max_age`, so quiet chats don't produce a small block per run.
+
+    Every worker starts the background loop, but a run only happens under
+    a lease in the `leases` collection (claimed with find_one_and_update,
+    renewed while the run goes on), so one worker archives at a time.
+    """
+
+    def __init__(self, db, fields: dict, max_age: timedelta, block_size: int = 500, interval: float = 3600.0,
+                 compression_level: int = 6, lease_ttl: float = 600.0):
+        self.db = db
+        self.fields = fields
+        self.max_age = max_age
+        self.block_size = block_size
+        self.interval = interval
+        self.compression_level = compression_level
+        self.lease_ttl = lease_ttl
+        self.holder = uuid.uuid4().hex
+        self.blocks_written = 0
+        self.messages_archived = 0
+        self.last_run: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_age > timedelta(0) and self.block_size > 0
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "blocks_written": self.blocks_written,
+            "messages_archived": self.messages_archived,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+        }
+
+    # ---- reads ----
+
+    async def read_before(self, chat_id, before: Optional[Position], limit: int) -> List[dict]:
+        """Up to `limit` archived messages strictly before `before` (newest
+        ones), in ascending order."""
+        query = {"chat_id": chat_id}
+        if before is not None:
+            query["first_created_at"] = {"$lte": before[0]}
+        cursor = self.db.message_archive.find(query).sort([("first_created_at", DESCENDING), ("_id", DESCENDING)])
+        collected: List[dict] = []
+        async for block in cursor:
+            messages = [m for m in self._decode(block) if before is None or position(m) < before]
+            collected = messages[-(limit - len(collected)):] + collected
+            if len(collected) >= limit:
+                break
+        return collected
+
+    async def read_after(self, chat_id, after: Position, limit: int) -> List[dict]:
+        """Up to `limit` archived messages strictly after `after`, ascending."""
+        query = {"chat_id": chat_id, "last_created_at": {"$gte": after[0]}}
+        cursor = self.db.message_archive.find(query).sort([("last_created_at", ASCENDING), ("_id", ASCENDING)])
+        collected: List[dict] = []
+        async for block in cursor:
+            collected.extend(m for m in self._decode(block) if position(m) > after)
+            if len(collected) >= limit:
+                break
+        return collected[:limit]
+
+    async def count_between(self, chat_id, after: Optional[Position], upto: Position, exclude_sender: str) -> int:
+        """Archived messages in (after, upto] not sent by `exclude_sender`.
+        Blocks fully inside the range are counted from their per-sender
+        totals; only the (at most two) boundary blocks are decompressed."""
+        query = {"chat_id": chat_id, "first_created_at": {"$lte": upto[0]}}
+        if after is not None:
+            query["last_created_at"] = {"$gte": after[0]}
+        total = 0
+        async for block in self.db.message_archive.find(query, {"data": 0}):
+            first = (block["first_created_at"], block["_id"])
+            last = (block["last_created_at"], block["last_id"])
+            if (after is None or first > after) and last <= upto:
+                total += block["count"] - block["senders"].get(exclude_sender, 0)
+                continue
+            full = await self.db.message_archive.find_one({"_id": block["_id"]})
+            total += sum(
+                1 for m in self._decode(full)
+                if (after is None or position(m) > after) and position(m) <= upto and m["sender_id"] != exclude_sender
+            )
+        return total
+
+    async def find(self, chat_id, message_id) -> Optional[dict]:
+        """An archived message by id. For UUIDv7 ids only blocks around the
+        id's timestamp are decoded; older random ids scan the chat's blocks."""
+        query = {"chat_id": chat_id}
+        if message_id.version == 7:
+            moment = datetime.utcfromtimestamp((message_id.int >> 80) / 1000)
+            query["first_created_at"] = {"$lte": moment + timedelta(seconds=1)}
+            query["last_created_at"] = {"$gte": moment - timedelta(seconds=1)}
+        async for block in self.db.message_archive.find(query):
+            for message in self._decode(block):
+                if message["id"] == message_id:
+                    return message
+        return None
+
+    def _decode(self, block: dict) -> List[dict]:
+        return bson.decode(zlib.decompress(block["data"]), codec_options=CODEC_OPTIONS)["messages"]
+
+    # ---- archiving ----
+
+    async def archive_chat(self, chat_id, cutoff: datetime) -> int:
+        moved = 0
+        while True:
+            messages = await self.db.messages.find({"chat_id": chat_id, "created_at": {"$lt": cutoff}}, self.fields) \
+                .sort([("created_at", ASCENDING), ("id", ASCENDING)]).limit(self.block_size).to_list(self.block_size)
+            if not messages:
+                return moved
+            if len(messages) < self.block_size and messages[-1]["created_at"] >= cutoff - self.max_age:
+                return moved
+            senders = {}
+            for message in messages:
+                senders[message["sender_id"]] = senders.get(message["sender_id"], 0) + 1
+            raw = bson.encode({"messages": messages}, codec_options=CODEC_OPTIONS)
+            first, last = messages[0], messages[-1]
+            block = {
+                "_id": first["id"],
+                "chat_id": chat_id,
+                "first_created_at": first["created_at"],
+                "last_created_at": last["created_at"],
+                "last_id": last["id"],
+                "count": len(messages),
+                "senders": senders,
+                "codec": "zlib",
+                "data": bson.Binary(zlib.compress(raw, self.compression_level)),
+            }
+            # сначала блок, потом удаление: после сбоя повторный проход перепишет тот же блок
+            await self.db.message_archive.replace_one({"_id": block["_id"]}, block, upsert=True)
+            await self.db.chats.update_one(
+                {"id": chat_id}, {"$max": {"archived_upto": {"created_at": last["created_at"], "id": last["id"]}}}
+            )
+            await self.db.messages.delete_many({"chat_id": chat_id, "id": {"$in": [m["id"] for m in messages]}})
+            self.blocks_written += 1
+            self.messages_archived += len(messages)
+            moved += len(messages)
+            if len(messages) < self.block_size:
+                return moved
+
+    async def acquire_lease(self) -> bool:
+        """Claim or renew the archiver lease; False while another worker
+        holds an unexpired one."""
+        now = datetime.utcnow()
+        try:
+            await self.db.leases.find_one_and_update(
+                {"_id": LEASE_ID, "$or": [{"holder": self.holder}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"holder": self.holder, "expires_at": now + timedelta(seconds=self.lease_ttl)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False  # документ есть, но аренда чужая и не истекла
+        return True
+
+    async def release_lease(self):
+        await self.db.leases.update_one(
+            {"_id": LEASE_ID, "holder": self.holder}, {"$set": {"expires_at": datetime.utcnow()}}
+        )
+
+    async def run_once(self) -> int:
+        if not self.enabled or not await self.acquire_lease():
+            return 0
+        cutoff = datetime.utcnow() - self.max_age
+        moved = 0
+        renewed = datetime.utcnow()
+        for chat_id in await self.db.messages.distinct("chat_id", {"created_at": {"$lt": cutoff}}):
+            # аренду продлеваем заранее; потеряли — дальше архивирует другой воркер
+            if datetime.utcnow() - renewed > timedelta(seconds=self.lease_ttl / 3):
+                if not await self.acquire_lease():
+                    break
+                renewed = datetime.utcnow()
+            try:
+                moved += await self.archive_chat(chat_id, cutoff)
+            except Exception as e:
+                logger.error(f"Archiving chat {chat_id} failed: {e}")
+        self.last_run = datetime.utcnow()
+        if moved:
+            logger.info(f"Archived {moved} messages older than {cutoff.isoformat()}")
+        return moved
+
+    def start(self):
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.release_lease()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Message archiver run failed: {e}")
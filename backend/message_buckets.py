@@ -0,0 +1,124 @@
+# message_buckets.py
+from datetime import timedelta
+from typing import List, Optional
+
+from pymongo import ASCENDING, DESCENDING
+
+from ids import new_id
+from message_archive import Position, position
+
+
+class MessageBuckets:
+    """Bucketed message storage: one document per chat per `size` messages
+    or `window` of time, whichever fills first.
+
+    append is a single upsert ($push into the newest open bucket,
+    or a new bucket when none is open), so a chat costs one document and
+    one index entry per bucket instead of per message, and the latest page
+    is read from one or two documents. Concurrent first writes can open two
+    buckets at once; buckets may then overlap in time, so readers merge by
+    (created_at, id) instead of trusting bucket order.
+
+    Read methods mirror MessageArchive: positions are (created_at, id) and
+    results come back in ascending order.
+    """
+
+    def __init__(self, db, size: int = 200, window: timedelta = timedelta(days=1)):
+        self.db = db
+        self.size = size
+        self.window = window
+
+    async def append(self, message: dict):
+        await self.db.message_buckets.update_one(
+            {
+                "chat_id": message["chat_id"],
+                "count": {"$lt": self.size},
+                "first_created_at": {"$gte": message["created_at"] - self.window},
+            },
+            {
+                "$push": {"messages": message},
+                "$inc": {"count": 1, f"senders.{message['sender_id']}": 1},
+                "$min": {"first_created_at": message["created_at"]},
+                "$max": {"last": {"created_at": message["created_at"], "id": message["id"]}},
+                "$setOnInsert": {"_id": new_id()},
+            },
+            upsert=True,
+        )
+
+    def fits(self, messages: List[dict], message: dict) -> bool:
+        """Whether `message` may join a bucket holding `messages`."""
+        return len(messages) < self.size and message["created_at"] - messages[0]["created_at"] <= self.window
+
+    async def store(self, chat_id, messages: List[dict]) -> int:
+        """Write already-sorted messages as one bucket keyed by the first
+        message id, so a repeated load rewrites the same bucket."""
+        senders = {}
+        for message in messages:
+            senders[message["sender_id"]] = senders.get(message["sender_id"], 0) + 1
+        last = messages[-1]
+        await self.db.message_buckets.replace_one({"_id": messages[0]["id"]}, {
+            "_id": messages[0]["id"],
+            "chat_id": chat_id,
+            "first_created_at": messages[0]["created_at"],
+            "last": {"created_at": last["created_at"], "id": last["id"]},
+            "count": len(messages),
+            "senders": senders,
+            "messages": messages,
+        }, upsert=True)
+        return len(messages)
+
+    async def find(self, chat_id, message_id) -> Optional[dict]:
+        # индекса по messages.id нет (он вернул бы запись на сообщение): перебор бакетов одного чата
+        bucket = await self.db.message_buckets.find_one(
+            {"chat_id": chat_id, "messages.id": message_id}, {"_id": 0, "messages": {"$elemMatch": {"id": message_id}}}
+        )
+        return bucket["messages"][0] if bucket else None
+
+    async def read_before(self, chat_id, before: Optional[Position], limit: int) -> List[dict]:
+        """Up to `limit` newest messages strictly before `before`, ascending."""
+        query = {"chat_id": chat_id}
+        if before is not None:
+            query["first_created_at"] = {"$lte": before[0]}
+        cursor = self.db.message_buckets.find(query, {"_id": 0, "last": 1, "messages": 1}) \
+            .sort([("last.created_at", DESCENDING), ("_id", DESCENDING)])
+        collected: List[dict] = []
+        async for bucket in cursor:
+            # остальные бакеты целиком старше уже набранной страницы
+            if len(collected) >= limit and bucket["last"]["created_at"] < collected[-limit]["created_at"]:
+                break
+            collected.extend(m for m in bucket["messages"] if before is None or position(m) < before)
+            collected.sort(key=position)
+        return collected[-limit:]
+
+    async def read_after(self, chat_id, after: Position, limit: int) -> List[dict]:
+        """Up to `limit` oldest messages strictly after `after`, ascending."""
+        query = {"chat_id": chat_id, "last.created_at": {"$gte": after[0]}}
+        cursor = self.db.message_buckets.find(query, {"_id": 0, "first_created_at": 1, "messages": 1}) \
+            .sort([("first_created_at", ASCENDING), ("_id", ASCENDING)])
+        collected: List[dict] = []
+        async for bucket in cursor:
+            if len(collected) >= limit and bucket["first_created_at"] > collected[limit - 1]["created_at"]:
+                break
+            collected.extend(m for m in bucket["messages"] if position(m) > after)
+            collected.sort(key=position)
+        return collected[:limit]
+
+    async def count_between(self, chat_id, after: Optional[Position], upto: Position, exclude_sender: str) -> int:
+        """Messages in (after, upto] not sent by `exclude_sender`. Buckets
+        fully inside the range are counted from their per-sender totals."""
+        query = {"chat_id": chat_id, "first_created_at": {"$lte": upto[0]}}
+        if after is not None:
+            query["last.created_at"] = {"$gte": after[0]}
+        total = 0
+        async for bucket in self.db.message_buckets.find(query, {"messages": 0}):
+            first = bucket["first_created_at"]
+            last = (bucket["last"]["created_at"], bucket["last"]["id"])
+            if (after is None or first > after[0]) and last <= upto:
+                total += bucket["count"] - bucket.get("senders", {}).get(exclude_sender, 0)
+                continue
+            full = await self.db.message_buckets.find_one({"_id": bucket["_id"]}, {"messages": 1})
+            total += sum(
+                1 for m in full["messages"]
+                if (after is None or position(m) > after) and position(m) <= upto and m["sender_id"] != exclude_sender
+            )
+        return total
@@ -0,0 +1,232 @@
+# migrations.py
+# Разовые миграции данных: python migrations.py <name> [<name> ...]
+import os
+import sys
+import uuid
+import asyncio
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from message_archive import MessageArchive
+from message_buckets import MessageBuckets
+from tags import normalize_tags
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / ".env")
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("migrations")
+
+BATCH_SIZE = 1000
+MESSAGE_BUCKET_SIZE = int(os.environ.get("MESSAGE_BUCKET_SIZE", "200"))
+MESSAGE_BUCKET_HOURS = float(os.environ.get("MESSAGE_BUCKET_HOURS", "24"))
+MESSAGE_PREVIEW_LENGTH = 100  # как в main.py
+
+# Поля со строковыми uuid4, которые переводятся в BSON Binary subtype 4
+UUID_FIELDS = {
+    "posts": ["id"],
+    "comments": ["id", "post_id"],
+    "chats": ["id"],
+    "messages": ["id", "chat_id"],
+}
+
+
+async def migrate_ids(db) -> dict:
+    """Convert string ids to binary UUIDs in place; values stay the same, so
+    ids already known to clients keep working. Safe to re-run."""
+    converted = {}
+    for collection_name, fields in UUID_FIELDS.items():
+        collection = db[collection_name]
+        for field in fields:
+            count = 0
+            last_id = None
+            while True:
+                query = {field: {"$type": "string"}}
+                if last_id is not None:
+                    query["_id"] = {"$gt": last_id}
+                docs = await collection.find(query, {field: 1}).sort("_id", ASCENDING).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+                if not docs:
+                    break
+                last_id = docs[-1]["_id"]
+                ops = []
+                for doc in docs:
+                    try:
+                        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: uuid.UUID(doc[field])}}))
+                    except ValueError:
+                        logger.warning(f"{collection_name}.{field}: not a uuid, left as is: {doc[field]!r}")
+                if ops:
+                    await collection.bulk_write(ops, ordered=False)
+                    count += len(ops)
+            converted[f"{collection_name}.{field}"] = count
+            logger.info(f"{collection_name}.{field}: {count} converted")
+    return converted
+
+
+async def migrate_chat_pairs(db) -> dict:
+    """Backfill chats.pair_key for active chats. When a pair already has
+    several active chats, only the most recently used one gets the key
+    (and is what create_chat returns from now on); the others keep working
+    but are left out of the unique index. Safe to re-run."""
+    pipeline = [
+        {"$match": {"is_active": True, "pair_key": {"$exists": False}}},
+        {"$sort": {"last_message_at": DESCENDING}},
+        {"$project": {"id": 1, "participants": 1}},
+    ]
+    claimed = set(await db.chats.distinct("pair_key", {"is_active": True, "pair_key": {"$exists": True}}))
+    ops, keyed, skipped = [], 0, 0
+    async for chat in db.chats.aggregate(pipeline, allowDiskUse=True):
+        participants = sorted(set(chat.get("participants", [])))
+        if len(participants) != 2:
+            skipped += 1
+            continue
+        pair_key = ":".join(participants)
+        if pair_key in claimed:
+            skipped += 1
+            continue
+        claimed.add(pair_key)
+        ops.append(UpdateOne({"_id": chat["_id"]}, {"$set": {"pair_key": pair_key}}))
+        if len(ops) >= BATCH_SIZE:
+            await db.chats.bulk_write(ops, ordered=False)
+            keyed += len(ops)
+            ops = []
+    if ops:
+        await db.chats.bulk_write(ops, ordered=False)
+        keyed += len(ops)
+    logger.info(f"chats.pair_key: {keyed} set, {skipped} duplicate or malformed chats left without a key")
+    return {"keyed": keyed, "skipped": skipped}
+
+
+async def latest_message(db, chat_id):
+    # самое новое сообщение чата, где бы оно ни лежало: messages, бакеты или архив
+    latest = await db.messages.find({"chat_id": chat_id}, {"_id": 0}) \
+        .sort([("created_at", DESCENDING), ("id", DESCENDING)]).limit(1).to_list(1)
+    bucket = await MessageBuckets(db).read_before(chat_id, None, 1)
+    archived = await MessageArchive(db, {}, max_age=timedelta(0)).read_before(chat_id, None, 1)
+    candidates = latest + bucket + archived
+    return max(candidates, key=lambda m: (m["created_at"], m["id"])) if candidates else None
+
+
+async def migrate_chat_counters(db) -> dict:
+    """Backfill message_count and seen_counts for chats created before the
+    inbox counters existed: every message counts, each participant has seen
+    their own ones. Chats that already have message_count are skipped.
+    last_message is backfilled from the newest stored message the same way."""
+    updated = 0
+    async for chat in db.chats.find({"message_count": {"$exists": False}}, {"id": 1}):
+        per_sender = await db.messages.aggregate([
+            {"$match": {"chat_id": chat["id"]}},
+            {"$group": {"_id": "$sender_id", "count": {"$sum": 1}}},
+        ]).to_list(None)
+        fields = {"message_count": sum(row["count"] for row in per_sender)}
+        fields.update({f"seen_counts.{row['_id']}": row["count"] for row in per_sender})
+        result = await db.chats.update_one({"_id": chat["_id"], "message_count": {"$exists": False}}, {"$set": fields})
+        updated += result.modified_count
+    previews = 0
+    async for chat in db.chats.find({"last_message": {"$exists": False}}, {"id": 1}):
+        message = await latest_message(db, chat["id"])
+        if message is None:
+            continue
+        preview = {
+            "id": message["id"],
+            "sender_id": message["sender_id"],
+            "sender_display_name": message.get("sender_display_name"),
+            "content": message.get("content", "")[:MESSAGE_PREVIEW_LENGTH],
+            "created_at": message["created_at"],
+        }
+        # сообщение, отправленное во время миграции, уже записало своё превью — его не трогаем
+        result = await db.chats.update_one(
+            {"_id": chat["_id"], "last_message": {"$exists": False}}, {"$set": {"last_message": preview}}
+        )
+        previews += result.modified_count
+    logger.info(f"chats.message_count: {updated} chats backfilled, {previews} last_message previews set")
+    return {"updated": updated, "previews": previews}
+
+
+async def migrate_message_buckets(db) -> dict:
+    """Move per-message documents into per-chat buckets before switching to
+    MESSAGE_STORAGE=buckets. Each bucket is written before its messages are
+    deleted and is keyed by its first message id, so an interrupted run can
+    simply be repeated."""
+    buckets = MessageBuckets(db, size=MESSAGE_BUCKET_SIZE, window=timedelta(hours=MESSAGE_BUCKET_HOURS))
+    moved = written = 0
+    for chat_id in await db.messages.distinct("chat_id"):
+        pending = []
+        cursor = db.messages.find({"chat_id": chat_id}, {"_id": 0}).sort([("created_at", ASCENDING), ("id", ASCENDING)])
+        async for message in cursor:
+            if pending and not buckets.fits(pending, message):
+                moved += await buckets.store(chat_id, pending)
+                await db.messages.delete_many({"id": {"$in": [m["id"] for m in pending]}})
+                written += 1
+                pending = []
+            pending.append(message)
+        if pending:
+            moved += await buckets.store(chat_id, pending)
+            await db.messages.delete_many({"id": {"$in": [m["id"] for m in pending]}})
+            written += 1
+    logger.info(f"message_buckets: {moved} messages moved into {written} buckets")
+    return {"moved": moved, "buckets": written}
+
+
+async def migrate_tag_counts(db) -> dict:
+    """Normalize tags of existing posts and rebuild tag_counts from the
+    visible ones. Counts are overwritten, so increments from posts created
+    while this runs can be lost; re-run it once writes are quiet."""
+    normalized = 0
+    ops = []
+    async for post in db.posts.find({"tags.0": {"$exists": True}}, {"tags": 1}):
+        tags = normalize_tags(post["tags"])
+        if tags != post["tags"]:
+            ops.append(UpdateOne({"_id": post["_id"]}, {"$set": {"tags": tags}}))
+        if len(ops) >= BATCH_SIZE:
+            await db.posts.bulk_write(ops, ordered=False)
+            normalized += len(ops)
+            ops = []
+    if ops:
+        await db.posts.bulk_write(ops, ordered=False)
+        normalized += len(ops)
+
+    counts = await db.posts.aggregate([
+        {"$match": {"is_blocked": False}},
+        {"$unwind": "$tags"},
+        {"$group": {"_id": "$tags", "count": {"$sum": 1}}},
+    ], allowDiskUse=True).to_list(None)
+    ops = [UpdateOne({"_id": row["_id"]}, {"$set": {"count": row["count"]}}, upsert=True) for row in counts]
+    for start in range(0, len(ops), BATCH_SIZE):
+        await db.tag_counts.bulk_write(ops[start:start + BATCH_SIZE], ordered=False)
+    stale = await db.tag_counts.delete_many({"_id": {"$nin": [row["_id"] for row in counts]}})
+    logger.info(f"tag_counts: {normalized} posts normalized, {len(counts)} tags counted, {stale.deleted_count} stale removed")
+    return {"normalized": normalized, "tags": len(counts), "stale": stale.deleted_count}
+
+
+MIGRATIONS = {
+    "ids": migrate_ids,
+    "chat_pairs": migrate_chat_pairs,
+    "chat_counters": migrate_chat_counters,
+    "message_buckets": migrate_message_buckets,
+    "tag_counts": migrate_tag_counts,
+}
+
+
+async def run(names):
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"], uuidRepresentation="standard")
+    db = client[os.environ["DB_NAME"]]
+    try:
+        for name in names:
+            logger.info(f"Running migration {name}")
+            await MIGRATIONS[name](db)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    unknown = [name for name in names if name not in MIGRATIONS]
+    if not names or unknown:
+        print(f"usage: python migrations.py {' | '.join(MIGRATIONS)} ...")
+        sys.exit(1)
+    asyncio.run(run(names))
@@ -0,0 +1,62 @@
+# pagination.py
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Tuple, Union
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, item_id: Union[str, uuid.UUID]) -> str:
+    raw = json.dumps([created_at.isoformat(), str(item_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), uuid.UUID(item_id)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def encode_rank_cursor(rank: float, item_id: Union[str, uuid.UUID]) -> str:
+    raw = json.dumps([rank, str(item_id)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, item_id = json.loads(raw)
+        return float(rank), uuid.UUID(item_id)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from e
+
+
+def position_filter(created_at: datetime, item_id: uuid.UUID, after: bool, inclusive: bool = False,
+                    field: str = "created_at") -> dict:
+    """Rows after (or before) the position (created_at, id) in (field, id) order.
+
+    The outer range on `field` keeps the query an index range scan; the
+    `$or` only breaks ties between rows sharing the same timestamp.
+    """
+    if after:
+        return {
+            field: {"$gte": created_at},
+            "$or": [{field: {"$gt": created_at}}, {"id": {"$gte" if inclusive else "$gt": item_id}}],
+        }
+    return {
+        field: {"$lte": created_at},
+        "$or": [{field: {"$lt": created_at}}, {"id": {"$lte" if inclusive else "$lt": item_id}}],
+    }
+
+
+def keyset_filter(cursor: str, descending: bool = True, field: str = "created_at") -> dict:
+    """Filter for rows strictly after `cursor` in (field, id) order."""
+    created_at, item_id = decode_cursor(cursor)
+    return position_filter(created_at, item_id, after=not descending, field=field)
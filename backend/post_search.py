@@ -0,0 +1,207 @@
+# post_search.py
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+import snowballstemmer
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[^\W_]+")
+CYRILLIC_RE = re.compile(r"[а-я]")
+
+# title важнее тегов, теги важнее текста
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.0, "content": 1.0}
+SEARCH_FIELDS = {"_id": 0, "id": 1, "title": 1, "content": 1, "tags": 1, "created_at": 1}
+
+_russian = snowballstemmer.stemmer("russian")
+_english = snowballstemmer.stemmer("english")
+
+
+@lru_cache(maxsize=100_000)
+def stem(word: str) -> str:
+    return (_russian if CYRILLIC_RE.search(word) else _english).stemWord(word)
+
+
+def tokenize(text: str) -> List[str]:
+    # ё и е не различаем: пишут и так, и так
+    return [stem(word) for word in TOKEN_RE.findall(text.lower().replace("ё", "е")) if len(word) > 1 or word.isdigit()]
+
+
+def _timestamp(moment: datetime) -> float:
+    return moment.replace(tzinfo=timezone.utc).timestamp() if moment.tzinfo is None else moment.timestamp()
+
+
+class PostSearchIndex:
+    """In-process inverted index over post title, tags and content.
+
+    Terms are Snowball stems (Russian for Cyrillic words, English
+    otherwise). Every query term must match; the last one also matches as
+    a prefix (from `min_prefix` characters on), so results follow the user
+    while they type. Relevance is a log-tf sum with per-field weights and
+    no idf: every term has to match anyway, and a corpus-wide statistic
+    would shift every rank whenever a post is added. Ranking adds recency
+    as log(relevance) + created_at / recency, so a post's rank depends on
+    the post alone and (rank, id) cursors stay valid between pages.
+
+    The index keeps ids and terms only; posts are loaded from Mongo per
+    page. It is filled by `load` at startup (newest posts first) and kept
+    current from post events, so each worker holds its own copy.
+    """
+
+    def __init__(self, recency: float = 30 * 86400, max_query_terms: int = 8, min_prefix: int = 3):
+        self.recency = recency
+        self.min_prefix = min_prefix
+        self.max_query_terms = max_query_terms
+        self.ready = False
+        self.queries = 0
+        # ключи — UUID.int: хэшируются и сравниваются в разы быстрее самих UUID
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._docs: Dict[int, Tuple[float, Tuple[str, ...]]] = {}
+        self._vocabulary: List[str] = []  # отсортированные термы для поиска по префиксу
+        self._removed_while_loading: set = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def stats(self) -> dict:
+        return {"ready": self.ready, "posts": len(self._docs), "terms": len(self._postings), "queries": self.queries}
+
+    # ---- updates ----
+
+    def add(self, post: dict):
+        key = post["id"].int
+        if key in self._docs:
+            self.remove(post["id"])
+        weights: Counter = Counter()
+        for term in tokenize(post.get("title", "")):
+            weights[term] += FIELD_WEIGHTS["title"]
+        for term in tokenize(" ".join(post.get("tags", []))):
+            weights[term] += FIELD_WEIGHTS["tags"]
+        for term in tokenize(post.get("content", "")):
+            weights[term] += FIELD_WEIGHTS["content"]
+        for term, weight in weights.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[key] = math.log1p(weight)
+        # вклад свежести в ранг считается один раз при индексации
+        self._docs[key] = (_timestamp(post["created_at"]) / self.recency, tuple(weights))
+
+    def remove(self, post_id: UUID):
+        if not self.ready:
+            self._removed_while_loading.add(post_id)
+        key = post_id.int
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for term in doc[1]:
+            postings = self._postings[term]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    # ---- queries ----
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int, after: Optional[Tuple[float, UUID]] = None) -> List[Tuple[float, UUID]]:
+        """Top `limit` (rank, post_id) pairs, best first, strictly after the
+        `after` position of a previous page."""
+        self.queries += 1
+        words = tokenize(query)[:self.max_query_terms]
+        if not words:
+            return []
+        # у каждого слова запроса — набор термов; у последнего это все термы с таким префиксом
+        slots = [[word] if word in self._postings else [] for word in words[:-1]]
+        last = words[-1]
+        if len(last) >= self.min_prefix:
+            slots.append(self._expand(last))
+        elif last in self._postings:
+            slots.append([last])
+        elif not slots:
+            # короткий недописанный префикс раскрылся бы в сотни термов: ждём следующую букву
+            return []
+        if not all(slots):
+            return []
+        # {ключ: вес} на слово; для одного терма postings используются без копирования
+        scored = [self._postings[terms[0]] for terms in slots if len(terms) == 1]
+        prefix_terms = slots[-1] if len(slots[-1]) > 1 else None
+        prefix_size = sum(len(self._postings[term]) for term in prefix_terms) if prefix_terms else 0
+        scored.sort(key=len)
+        if prefix_terms and (not scored or prefix_size <= len(scored[0])):
+            # префикс — самое узкое слово: сливаем его postings и перебираем их
+            merged: Dict[int, float] = {}
+            for term in prefix_terms:
+                for key, weight in self._postings[term].items():
+                    if weight > merged.get(key, 0.0):
+                        merged[key] = weight
+            scored.insert(0, merged)
+            prefix_terms = None
+        candidates, rest = scored[0], scored[1:]
+        docs, postings = self._docs, self._postings
+        after_key = (after[0], after[1].int) if after is not None else None
+        ranked = []
+        for key, total in candidates.items():
+            for other in rest:
+                extra = other.get(key)
+                if extra is None:
+                    break
+                total += extra
+            else:
+                if prefix_terms:
+                    # иначе префикс проверяем по термам самого кандидата: работа ограничена
+                    # postings самого узкого слова, сколько бы термов ни начиналось с префикса
+                    weights = [postings[term][key] for term in docs[key][1] if term.startswith(last)]
+                    if not weights:
+                        continue
+                    total += max(weights)
+                item = (math.log(total) + docs[key][0], key)
+                if after_key is None or item < after_key:
+                    ranked.append(item)
+        return [(rank, UUID(int=key)) for rank, key in heapq.nlargest(limit, ranked)]
+
+    # ---- loading ----
+
+    async def load(self, posts):
+        """Index every visible post from the `posts` collection, newest
+        first, so search is useful before loading finishes."""
+        count = 0
+        cursor = posts.find({"is_blocked": False}, SEARCH_FIELDS).sort([("created_at", -1), ("id", -1)])
+        async for post in cursor:
+            if post["id"] not in self._removed_while_loading and post["id"].int not in self._docs:
+                self.add(post)
+            count += 1
+            if count % 1000 == 0:
+                await asyncio.sleep(0)  # не держим цикл событий на больших коллекциях
+        self.ready = True
+        self._removed_while_loading.clear()
+        logger.info(f"Search index loaded: {len(self._docs)} posts, {len(self._postings)} terms")
+
+    def start(self, posts):
+        if self._task is None:
+            self._task = asyncio.create_task(self._load_logged(posts))
+
+    async def _load_logged(self, posts):
+        try:
+            await self.load(posts)
+        except Exception as e:
+            logger.error(f"Search index load failed: {e}")
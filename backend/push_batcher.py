@@ -0,0 +1,79 @@
+# push_batcher.py
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PushBatcher:
+    """Collects push intents and hands them to `submit` in batches.
+
+    A batch is sent once it reaches `max_items` or `max_delay` seconds after
+    its first item, whichever comes first. Intents beyond `max_queue` are
+    dropped (and counted) rather than growing memory without bound.
+    """
+
+    def __init__(self, submit: Callable[[List[dict]], Awaitable[None]],
+                 max_items: int = 100, max_delay: float = 0.01, max_queue: int = 10000):
+        self.submit = submit
+        self.max_items = max_items
+        self.max_delay = max_delay
+        self._queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+        self.dropped = 0
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize(), "batches": self.batches, "items": self.items, "dropped": self.dropped}
+
+    def add(self, item: dict) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Push queue full, dropping push for {item.get('user_id')}")
+            return False
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0):
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Push batcher stopped with {self._queue.qsize()} pushes unsent")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_items:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self.submit(batch)
+                self.batches += 1
+                self.items += len(batch)
+            except Exception as e:
+                logger.error(f"Push batch of {len(batch)} failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
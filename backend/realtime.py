@@ -0,0 +1,80 @@
+# realtime.py
+import asyncio
+import logging
+from typing import Dict, Iterable, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One live connection: its user, its chats and a bounded outbox."""
+
+    def __init__(self, user_id: str, queue_size: int):
+        self.user_id = user_id
+        self.chat_ids: Set[str] = set()
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+
+class ChatHub:
+    """In-process publish/subscribe keyed by chat_id.
+
+    publish() never awaits: a connection whose outbox is full is marked as
+    overflowed and closed by its sender loop, so one slow client cannot hold
+    up delivery to the others. It reconnects and catches up with ?after=.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._by_chat: Dict[str, Set[Subscription]] = {}
+        self._by_user: Dict[str, Set[Subscription]] = {}
+        self.dropped = 0
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subs) for subs in self._by_user.values())
+
+    def connect(self, user_id: str, chat_ids: Iterable[str]) -> Subscription:
+        sub = Subscription(user_id, self.queue_size)
+        self._by_user.setdefault(user_id, set()).add(sub)
+        for chat_id in chat_ids:
+            self._subscribe(sub, chat_id)
+        return sub
+
+    def disconnect(self, sub: Subscription):
+        for chat_id in sub.chat_ids:
+            subs = self._by_chat.get(chat_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_chat[chat_id]
+        sub.chat_ids.clear()
+        subs = self._by_user.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._by_user[sub.user_id]
+
+    def join(self, chat_id: str, user_ids: Iterable[str]):
+        # новый чат: подписываем уже открытые соединения участников
+        for user_id in user_ids:
+            for sub in self._by_user.get(user_id, ()):
+                self._subscribe(sub, chat_id)
+
+    def publish(self, chat_id: str, payload: str) -> int:
+        delivered = 0
+        for sub in self._by_chat.get(chat_id, ()):
+            if sub.overflowed:
+                continue
+            try:
+                sub.queue.put_nowait(payload)
+                delivered += 1
+            except asyncio.QueueFull:
+                sub.overflowed = True
+                self.dropped += 1
+                logger.warning(f"Realtime outbox full for user {sub.user_id}, closing connection")
+        return delivered
+
+    def _subscribe(self, sub: Subscription, chat_id: str):
+        sub.chat_ids.add(chat_id)
+        self._by_chat.setdefault(chat_id, set()).add(sub)
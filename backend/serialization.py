@@ -0,0 +1,37 @@
+# serialization.py
+from typing import Dict, Iterable, List, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def projection(model: Type[BaseModel]) -> dict:
+    # только поля модели, без _id
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+def defaults(model: Type[BaseModel]) -> dict:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+        if not field.is_required()
+    }
+
+
+def lean_list(docs: Iterable[dict], model_defaults: Optional[dict] = None) -> List[dict]:
+    if not model_defaults:
+        return list(docs)
+    keys = model_defaults.keys()
+    # старые документы без новых полей получают значения по умолчанию
+    return [doc if keys <= doc.keys() else {**model_defaults, **doc} for doc in docs]
+
+
+def lean_response(docs: Iterable[dict], model_defaults: Optional[dict] = None,
+                  headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
+    """Serialize already-projected Mongo documents straight to JSON.
+
+    Skips building a Pydantic model per document and FastAPI's second
+    response_model validation; the documents are trusted because we wrote
+    them through the same models.
+    """
+    return ORJSONResponse(lean_list(docs, model_defaults), headers=headers)
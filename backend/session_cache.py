@@ -0,0 +1,69 @@
+# session_cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+class SessionCache:
+    """TTL + LRU cache of verified bearer tokens -> user objects.
+
+    Entries never outlive the token's own `exp` claim. All tokens of a user
+    can be dropped at once with `invalidate_user` (block, profile edit).
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # token -> (expires_at (monotonic), user_id, user)
+        self._entries: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[Any]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        expires_at, _, user = entry
+        if expires_at <= time.monotonic():
+            self._remove(token)
+            return None
+        self._entries.move_to_end(token)
+        return user
+
+    def put(self, token: str, user_id: str, user: Any, token_exp: Optional[float] = None):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+            if ttl <= 0:
+                return
+        if token in self._entries:
+            self._remove(token)
+        self._entries[token] = (time.monotonic() + ttl, user_id, user)
+        self._tokens_by_user.setdefault(user_id, set()).add(token)
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate(self, token: str):
+        if token in self._entries:
+            self._remove(token)
+
+    def invalidate_user(self, user_id: str):
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def _remove(self, token: str):
+        _, user_id, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
@@ -0,0 +1,13 @@
+# tags.py
+from typing import List
+
+
+def normalize_tags(tags: List[str]) -> List[str]:
+    """Lowercased tags without "#" and surrounding spaces, empty ones and
+    repeats dropped, so one tag is one feed and one counter."""
+    normalized = []
+    for tag in tags:
+        tag = tag.strip().lstrip("#").strip().lower()
+        if tag and tag not in normalized:
+            normalized.append(tag)
+    return normalized
@@ -0,0 +1,93 @@
+# task_supervisor.py
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK = "block"
+DROP_NEW = "drop_new"
+DROP_OLDEST = "drop_oldest"
+
+
+class TaskSupervisor:
+    """Runs fire-and-forget side work on a fixed pool of workers.
+
+    Jobs wait in a bounded queue. When it is full, `policy` decides:
+    BLOCK makes submit() wait for room (backpressure on the caller),
+    DROP_NEW rejects the new job, DROP_OLDEST evicts the oldest queued one.
+    Jobs are stored as (fn, args) so a dropped job never leaves an
+    un-awaited coroutine behind.
+    """
+
+    def __init__(self, workers: int = 8, max_queue: int = 1000, policy: str = DROP_NEW):
+        if policy not in (BLOCK, DROP_NEW, DROP_OLDEST):
+            raise ValueError(f"Unknown task policy: {policy}")
+        self.workers = workers
+        self.policy = policy
+        self._queue: "asyncio.Queue[Tuple[str, Callable[..., Awaitable[Any]], tuple, dict]]" = asyncio.Queue(
+            maxsize=max_queue
+        )
+        self._workers: List[asyncio.Task] = []
+        self.submitted = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+    async def submit(self, fn: Callable[..., Awaitable[Any]], *args, name: Optional[str] = None, **kwargs) -> bool:
+        job = (name or fn.__name__, fn, args, kwargs)
+        if self.policy == BLOCK:
+            await self._queue.put(job)
+        else:
+            if self._queue.full():
+                if self.policy == DROP_NEW:
+                    self.dropped += 1
+                    logger.warning(f"Task queue full, dropping {job[0]}")
+                    return False
+                evicted = self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+                logger.warning(f"Task queue full, dropping oldest {evicted[0]}")
+            self._queue.put_nowait(job)
+        self.submitted += 1
+        return True
+
+    def start(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def drain(self, timeout: float = 10.0):
+        if self._workers:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Task drain timed out: {self.stats()}")
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+
+    async def _work(self):
+        while True:
+            name, fn, args, kwargs = await self._queue.get()
+            self.running += 1
+            try:
+                await fn(*args, **kwargs)
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Background task {name} failed: {e}")
+            finally:
+                self.running -= 1
+                self._queue.task_done()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Backend micro-benchmarks for Криптонит.
+Runs in-process against the code in backend/ (no server, no MongoDB):
+- serialization: per-item cost of a 1000-message list, model path vs lean path
+- writes: add_comment / send_message latency over a simulated Mongo round trip
+- buckets: message documents vs per-chat buckets, write and read throughput
+  (needs the MongoDB from MONGO_URL; uses a scratch <DB_NAME>_bench database)
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+
+import main  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from ids import new_id  # noqa: E402
+from serialization import lean_response  # noqa: E402
+
+
+def make_message_docs(count, with_mongo_id=True):
+    chat_id = new_id()
+    sender_id = str(new_id())
+    start = datetime.utcnow().replace(microsecond=0)
+    docs = []
+    for i in range(count):
+        doc = {
+            "id": new_id(),
+            "chat_id": chat_id,
+            "sender_id": sender_id,
+            "sender_display_name": "Автор #1234",
+            "content": f"Тестовое сообщение номер {i}, немного текста для реалистичного размера",
+            "created_at": start + timedelta(milliseconds=i),
+            "is_read": False,
+        }
+        if with_mongo_id:
+            doc["_id"] = ObjectId()
+        docs.append(doc)
+    return docs
+
+
+def report(name, seconds, runs, items):
+    per_item_us = seconds / runs / items * 1e6
+    print(f"{name:<40} {seconds / runs * 1e3:9.3f} ms/list {per_item_us:8.3f} us/item")
+    return per_item_us
+
+
+async def _model_path(docs, field):
+    # как раньше: модель на документ + повторная валидация response_model + json.dumps
+    content = await serialize_response(field=field, response_content=[main.Message(**m) for m in docs])
+    return JSONResponse(content).body
+
+
+def bench_serialization(count=1000, runs=50):
+    import asyncio
+
+    print(f"== serialization: {count} messages, {runs} runs")
+    full_docs = make_message_docs(count, with_mongo_id=True)
+    projected_docs = [{k: v for k, v in d.items() if k != "_id"} for d in full_docs]
+    field = create_response_field(name="response", type_=list[main.Message])
+    loop = asyncio.new_event_loop()
+
+    assert loop.run_until_complete(_model_path(full_docs, field)) == \
+        loop.run_until_complete(_model_path(projected_docs, field))
+
+    before = timeit.timeit(lambda: loop.run_until_complete(_model_path(full_docs, field)), number=runs)
+    after = timeit.timeit(lambda: lean_response(projected_docs, main.MESSAGE_DEFAULTS).body, number=runs)
+    loop.close()
+
+    before_us = report("before: Message(**m) + response_model", before, runs, count)
+    after_us = report("after: projection + orjson", after, runs, count)
+    print(f"{'speedup':<40} {before_us / after_us:9.1f}x")
+
+
+class RoundTripCollection:
+    """Stands in for a motor collection: every call costs one network round trip."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self.calls = 0
+
+    async def _round_trip(self, result=None):
+        import asyncio
+
+        self.calls += 1
+        await asyncio.sleep(self.rtt)
+        return result
+
+    def find_one(self, *args, **kwargs):
+        return self._round_trip({"_id": ObjectId()})
+
+    def find_one_and_update(self, *args, **kwargs):
+        return self._round_trip({"_id": ObjectId()})
+
+    def insert_one(self, *args, **kwargs):
+        return self._round_trip()
+
+    def update_one(self, *args, **kwargs):
+        return self._round_trip()
+
+    def delete_one(self, *args, **kwargs):
+        return self._round_trip()
+
+
+class RoundTripDb(dict):
+    def __init__(self, rtt):
+        super().__init__()
+        self.rtt = rtt
+
+    def __getattr__(self, name):
+        return self.setdefault(name, RoundTripCollection(self.rtt))
+
+
+async def _add_comment_before(post_id, data, user):
+    # как раньше: find -> insert -> $inc, три последовательных round trip
+    db = main.db
+    if not await db.posts.find_one({"id": post_id, "is_blocked": False}):
+        raise LookupError(post_id)
+    comment = main.Comment(id=new_id(), post_id=post_id, author_id=user.id,
+                           author_display_name=user.display_name, content=data.content,
+                           created_at=datetime.utcnow())
+    await db.comments.insert_one(comment.dict())
+    await db.posts.update_one({"id": post_id}, {"$inc": {"comments_count": 1}})
+    return comment
+
+
+async def _send_message_before(chat_id, data, user):
+    db = main.db
+    if not await db.chats.find_one({"id": chat_id, "participants": user.id}):
+        raise LookupError(chat_id)
+    message = main.Message(id=new_id(), chat_id=chat_id, sender_id=user.id,
+                           sender_display_name=user.display_name, content=data.content,
+                           created_at=datetime.utcnow())
+    await db.messages.insert_one(message.dict())
+    await db.chats.update_one({"id": chat_id}, {"$set": {"last_message_at": datetime.utcnow()}})
+    await main.event_bus.publish("message.created", {"chat_id": str(chat_id), "message": main.jsonable_encoder(message)})
+    return message
+
+
+def bench_writes(rtt=0.002, runs=200):
+    import asyncio
+
+    print(f"== writes: {rtt * 1e3:.1f} ms simulated Mongo round trip, {runs} runs")
+    now = datetime.utcnow()
+    user = main.AnonymousUser(id=str(new_id()), anonymous_id="Автор #1234", display_name="Автор #1234",
+                              created_at=now, last_active=now)
+    cases = [
+        ("add_comment", _add_comment_before, main.add_comment, main.CommentCreate(content="Комментарий")),
+        ("send_message", _send_message_before, main.send_message, main.MessageCreate(content="Сообщение")),
+    ]
+    saved_db, main.db = main.db, RoundTripDb(rtt)
+    loop = asyncio.new_event_loop()
+    try:
+        for name, before_fn, after_fn, data in cases:
+            for label, fn in (("before", before_fn), ("after", after_fn)):
+                main.db.clear()
+                seconds = timeit.timeit(lambda: loop.run_until_complete(fn(new_id(), data, user)), number=runs)
+                trips = sum(collection.calls for collection in main.db.values()) / runs
+                print(f"{label + ': ' + name:<40} {seconds / runs * 1e3:9.3f} ms/request {trips:5.1f} Mongo calls")
+    finally:
+        loop.close()
+        main.db = saved_db
+
+
+async def _collection_stats(db, name):
+    stats = await db.command("collStats", name)
+    return f"{stats['count']:6d} docs {stats['size'] / 1024:9.0f} KiB data {stats['totalIndexSize'] / 1024:7.0f} KiB indexes"
+
+
+async def _bench_buckets(db, count, page, runs):
+    from indexes import INDEXES, IndexManager
+    from message_buckets import MessageBuckets
+
+    await IndexManager(db, {name: INDEXES[name] for name in ("messages", "message_buckets")}).ensure()
+    buckets = MessageBuckets(db, size=main.MESSAGE_BUCKET_SIZE, window=timedelta(hours=main.MESSAGE_BUCKET_HOURS))
+    docs = make_message_docs(count, with_mongo_id=False)
+    chat_id = docs[0]["chat_id"]
+
+    async def latest_documents():
+        messages = await db.messages.find({"chat_id": chat_id}, main.MESSAGE_FIELDS) \
+            .sort([("created_at", -1), ("id", -1)]).limit(page).to_list(page)
+        messages.reverse()
+        return messages
+
+    async def latest_buckets():
+        return await buckets.read_before(chat_id, None, page)
+
+    layouts = [
+        ("documents", lambda doc: db.messages.insert_one(dict(doc)), latest_documents, "messages"),
+        ("buckets", lambda doc: buckets.append(dict(doc)), latest_buckets, "message_buckets"),
+    ]
+    pages = []
+    for label, write, read, collection in layouts:
+        started = time.perf_counter()
+        for doc in docs:
+            await write(doc)
+        seconds = time.perf_counter() - started
+        print(f"{label + ': send':<40} {count / seconds:9.0f} messages/s")
+        started = time.perf_counter()
+        for _ in range(runs):
+            result = await read()
+        seconds = time.perf_counter() - started
+        pages.append([m["id"] for m in result])
+        print(f"{label + ': latest ' + str(page):<40} {runs / seconds:9.0f} pages/s {seconds / runs * 1e3:8.3f} ms/page")
+        print(f"{label + ': storage':<40} {await _collection_stats(db, collection)}")
+    assert pages[0] == pages[1]
+
+
+async def _run_buckets(count, page, runs):
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo.errors import PyMongoError
+
+    client = AsyncIOMotorClient(main.mongo_url, uuidRepresentation="standard", serverSelectionTimeoutMS=2000)
+    db = client[f"{main.db_name}_bench"]
+    try:
+        await client.admin.command("ping")
+    except PyMongoError as e:
+        print(f"skipped: no MongoDB at {main.mongo_url} ({e.__class__.__name__})")
+        client.close()
+        return
+    try:
+        await client.drop_database(db.name)
+        await _bench_buckets(db, count, page, runs)
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+
+def bench_buckets(count=5000, page=100, runs=200):
+    import asyncio
+
+    print(f"== buckets: {count} messages in one chat, bucket size {main.MESSAGE_BUCKET_SIZE}, {runs} latest-page reads")
+    asyncio.run(_run_buckets(count, page, runs))
+
+
+BENCHMARKS = {
+    "serialization": bench_serialization,
+    "writes": bench_writes,
+    "buckets": bench_buckets,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+        print()
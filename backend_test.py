@@ -135,6 +135,41 @@ class KriptonitAPITester:
             self.log_result("Get Current User (No Token)", False, "Request failed", str(e))
             return False
     
+    def test_blocked_user_session_rejected(self):
+        """Test that blocking a user rejects their already cached session"""
+        admin_token = os.environ.get("ADMIN_TOKEN")
+        if not admin_token:
+            self.log_result("Blocked User Session", True, "Skipped: ADMIN_TOKEN is not set")
+            return True
+            
+        try:
+            response = requests.post(f"{self.base_url}/auth/anonymous", json={}, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Blocked User Session", False, f"User creation failed: HTTP {response.status_code}", response.text)
+                return False
+            user = response.json()
+            headers = {"Authorization": f"Bearer {user['token']}"}
+            admin_headers = {"X-Admin-Token": admin_token}
+            block_url = f"{self.base_url}/admin/users/{user['id']}/blocked"
+            
+            # первый запрос кладёт сессию в кэш
+            before = requests.get(f"{self.base_url}/auth/me", headers=headers, timeout=10)
+            blocked = requests.put(block_url, json={"is_blocked": True}, headers=admin_headers, timeout=10)
+            after = requests.get(f"{self.base_url}/auth/me", headers=headers, timeout=10)
+            requests.put(block_url, json={"is_blocked": False}, headers=admin_headers, timeout=10)
+            restored = requests.get(f"{self.base_url}/auth/me", headers=headers, timeout=10)
+            
+            codes = [before.status_code, blocked.status_code, after.status_code, restored.status_code]
+            if codes == [200, 200, 403, 200]:
+                self.log_result("Blocked User Session", True, "Cached session rejected after block, accepted after unblock")
+                return True
+            else:
+                self.log_result("Blocked User Session", False, f"Expected [200, 200, 403, 200], got {codes}")
+                return False
+        except Exception as e:
+            self.log_result("Blocked User Session", False, "Request failed", str(e))
+            return False
+    
     def test_create_post(self):
         """Test creating a post"""
         if not self.auth_token:
@@ -225,6 +260,87 @@ class KriptonitAPITester:
             self.log_result("Get Posts", False, "Request failed", str(e))
             return False
     
+    def test_get_posts_cursor(self):
+        """Test keyset pagination of posts via X-Next-Cursor"""
+        try:
+            response = requests.get(f"{self.base_url}/posts", params={"limit": 1}, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Get Posts (Cursor)", False, f"HTTP {response.status_code}", response.text)
+                return False
+            first_page = response.json()
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                self.log_result("Get Posts (Cursor)", True, f"Single page only ({len(first_page)} posts), no cursor returned")
+                return True
+
+            response = requests.get(f"{self.base_url}/posts", params={"limit": 1, "cursor": cursor}, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Get Posts (Cursor)", False, f"HTTP {response.status_code}", response.text)
+                return False
+            second_page = response.json()
+            if second_page and second_page[0].get("id") == first_page[0].get("id"):
+                self.log_result("Get Posts (Cursor)", False, "Second page repeats the first one", second_page)
+                return False
+            self.log_result("Get Posts (Cursor)", True, "Cursor returned the next page")
+            return True
+        except Exception as e:
+            self.log_result("Get Posts (Cursor)", False, "Request failed", str(e))
+            return False
+    
+    def test_search_posts(self):
+        """Test full-text post search: Russian word forms and a typed prefix"""
+        if not self.test_post_id:
+            self.log_result("Search Posts", False, "No test post ID available")
+            return False
+
+        try:
+            for query in ["тестового поста", "провер"]:
+                response = requests.get(f"{self.base_url}/posts/search", params={"q": query}, timeout=10)
+                if response.status_code != 200:
+                    self.log_result("Search Posts", False, f"HTTP {response.status_code}", response.text)
+                    return False
+                if not any(post.get("id") == self.test_post_id for post in response.json()):
+                    self.log_result("Search Posts", False, f"Test post not found for {query!r}", response.json())
+                    return False
+            self.log_result("Search Posts", True, "Test post found by another word form and by prefix")
+            return True
+        except Exception as e:
+            self.log_result("Search Posts", False, "Request failed", str(e))
+            return False
+    
+    def test_get_posts_by_tag(self):
+        """Test the tag feed and the precomputed popular tags"""
+        if not self.test_post_id:
+            self.log_result("Get Posts By Tag", False, "No test post ID available")
+            return False
+
+        try:
+            response = requests.get(f"{self.base_url}/posts", params={"tag": "Криптонит"}, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Get Posts By Tag", False, f"HTTP {response.status_code}", response.text)
+                return False
+            data = response.json()
+            if not any(post.get("id") == self.test_post_id for post in data):
+                self.log_result("Get Posts By Tag", False, "Test post not in its tag feed", data)
+                return False
+            if any("криптонит" not in post.get("tags", []) for post in data):
+                self.log_result("Get Posts By Tag", False, "Tag feed contains posts without the tag", data)
+                return False
+
+            response = requests.get(f"{self.base_url}/tags/popular", params={"limit": 100}, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Get Posts By Tag", False, f"Popular tags: HTTP {response.status_code}", response.text)
+                return False
+            counts = {item["tag"]: item["count"] for item in response.json()}
+            if counts.get("криптонит", 0) < 1:
+                self.log_result("Get Posts By Tag", False, "Test post tag missing from popular tags", counts)
+                return False
+            self.log_result("Get Posts By Tag", True, f"Tag feed has {len(data)} posts, tag counted {counts['криптонит']} times")
+            return True
+        except Exception as e:
+            self.log_result("Get Posts By Tag", False, "Request failed", str(e))
+            return False
+    
     def test_get_single_post(self):
         """Test getting a single post"""
         if not self.test_post_id:
@@ -359,6 +475,66 @@ class KriptonitAPITester:
             self.log_result("Get Comments", False, "Request failed", str(e))
             return False
     
+    def test_get_comments_cursor(self):
+        """Test keyset pagination of comments via X-Next-Cursor"""
+        if not self.auth_token or not self.test_post_id:
+            self.log_result("Get Comments (Cursor)", False, "Missing auth token or post ID")
+            return False
+
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            response = requests.post(f"{self.base_url}/posts/{self.test_post_id}/comments",
+                                     json={"content": "Второй комментарий для проверки курсора."}, headers=headers, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Get Comments (Cursor)", False, f"HTTP {response.status_code}", response.text)
+                return False
+
+            url = f"{self.base_url}/posts/{self.test_post_id}/comments"
+            response = requests.get(url, params={"limit": 1}, timeout=10)
+            first_page = response.json()
+            cursor = response.headers.get("X-Next-Cursor")
+            if response.status_code != 200 or len(first_page) != 1 or not cursor:
+                self.log_result("Get Comments (Cursor)", False, f"HTTP {response.status_code}, cursor {cursor!r}", first_page)
+                return False
+
+            response = requests.get(url, params={"limit": 1, "cursor": cursor}, timeout=10)
+            second_page = response.json()
+            if response.status_code != 200 or len(second_page) != 1:
+                self.log_result("Get Comments (Cursor)", False, f"HTTP {response.status_code}", second_page)
+                return False
+            if second_page[0].get("id") == first_page[0].get("id") or second_page[0]["created_at"] < first_page[0]["created_at"]:
+                self.log_result("Get Comments (Cursor)", False, "Second page is not after the first one", second_page)
+                return False
+            self.log_result("Get Comments (Cursor)", True, "Cursor returned the next, newer comment")
+            return True
+        except Exception as e:
+            self.log_result("Get Comments (Cursor)", False, "Request failed", str(e))
+            return False
+    
+    def test_comments_conditional_get(self):
+        """Test ETag / If-None-Match on post comments"""
+        if not self.test_post_id:
+            self.log_result("Comments ETag", False, "No test post ID available")
+            return False
+
+        try:
+            url = f"{self.base_url}/posts/{self.test_post_id}/comments"
+            response = requests.get(url, timeout=10)
+            etag = response.headers.get("ETag")
+            if response.status_code != 200 or not etag:
+                self.log_result("Comments ETag", False, f"HTTP {response.status_code}, ETag {etag!r}", response.text)
+                return False
+
+            response = requests.get(url, headers={"If-None-Match": etag}, timeout=10)
+            if response.status_code == 304 and not response.content:
+                self.log_result("Comments ETag", True, "Unchanged comments returned 304")
+                return True
+            self.log_result("Comments ETag", False, f"Expected 304, got {response.status_code}", response.text)
+            return False
+        except Exception as e:
+            self.log_result("Comments ETag", False, "Request failed", str(e))
+            return False
+    
     def test_create_report(self):
         """Test creating a report"""
         if not self.auth_token or not self.test_post_id:
@@ -512,6 +688,30 @@ class KriptonitAPITester:
             self.log_result("Create Chat", False, "Request failed", str(e))
             return False
     
+    def test_create_chat_from_both_sides(self):
+        """Test that both participants opening a chat get the same chat back"""
+        if not self.auth_token or not self.auth_token_2 or not self.test_chat_id:
+            self.log_result("Create Chat (Both Sides)", False, "Missing auth tokens or chat ID")
+            return False
+
+        try:
+            ids = []
+            for token, receiver_id in ((self.auth_token_2, self.test_user_id), (self.auth_token, self.test_user_id_2)):
+                headers = {"Authorization": f"Bearer {token}"}
+                response = requests.post(f"{self.base_url}/chats", json={"receiver_id": receiver_id}, headers=headers, timeout=10)
+                if response.status_code != 200:
+                    self.log_result("Create Chat (Both Sides)", False, f"HTTP {response.status_code}", response.text)
+                    return False
+                ids.append(response.json().get("id"))
+            if ids == [self.test_chat_id, self.test_chat_id]:
+                self.log_result("Create Chat (Both Sides)", True, "Both participants got the existing chat")
+                return True
+            self.log_result("Create Chat (Both Sides)", False, "Chat ids differ", {"expected": self.test_chat_id, "got": ids})
+            return False
+        except Exception as e:
+            self.log_result("Create Chat (Both Sides)", False, "Request failed", str(e))
+            return False
+    
     def test_get_user_chats(self):
         """Test getting user's chats"""
         if not self.auth_token:
@@ -585,6 +785,64 @@ class KriptonitAPITester:
             self.log_result("Send Message", False, "Request failed", str(e))
             return False
     
+    def test_get_chat_inbox(self):
+        """Test the receiver's inbox: last message preview and unread count"""
+        if not self.auth_token_2 or not self.test_chat_id or not self.test_message_id:
+            self.log_result("Get Chat Inbox", False, "Missing second auth token, chat ID or message ID")
+            return False
+
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token_2}"}
+            response = requests.get(f"{self.base_url}/chats/inbox", headers=headers, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Get Chat Inbox", False, f"HTTP {response.status_code}", response.text)
+                return False
+
+            item = next((chat for chat in response.json() if chat.get("id") == self.test_chat_id), None)
+            if item is None:
+                self.log_result("Get Chat Inbox", False, "Test chat not in inbox", response.json())
+                return False
+            last_message = item.get("last_message") or {}
+            if (last_message.get("id") == self.test_message_id and
+                item.get("other_participant_id") == self.test_user_id and
+                item.get("unread_count", 0) >= 1):
+                self.log_result("Get Chat Inbox", True, f"Preview and {item['unread_count']} unread for test chat")
+                return True
+            self.log_result("Get Chat Inbox", False, "Inbox item mismatch", item)
+            return False
+        except Exception as e:
+            self.log_result("Get Chat Inbox", False, "Request failed", str(e))
+            return False
+    
+    def test_mark_chat_read(self):
+        """Test moving the receiver's read watermark and the sender's read receipt"""
+        if not self.auth_token_2 or not self.test_chat_id or not self.test_message_id:
+            self.log_result("Mark Chat Read", False, "Missing second auth token, chat ID or message ID")
+            return False
+
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token_2}"}
+            response = requests.post(f"{self.base_url}/chats/{self.test_chat_id}/read", headers=headers, timeout=10)
+            if response.status_code != 200:
+                self.log_result("Mark Chat Read", False, f"HTTP {response.status_code}", response.text)
+                return False
+            state = response.json()
+            if state.get("unread_count") != 0:
+                self.log_result("Mark Chat Read", False, "Unread count not reset", state)
+                return False
+
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            response = requests.get(f"{self.base_url}/chats/{self.test_chat_id}/messages", headers=headers, timeout=10)
+            message = next((m for m in response.json() if m.get("id") == self.test_message_id), None)
+            if message and message.get("is_read"):
+                self.log_result("Mark Chat Read", True, "Watermark moved, sender sees the message as read")
+                return True
+            self.log_result("Mark Chat Read", False, "Message not marked as read for the sender", message)
+            return False
+        except Exception as e:
+            self.log_result("Mark Chat Read", False, "Request failed", str(e))
+            return False
+    
     def test_get_chat_messages(self):
         """Test getting messages from chat"""
         if not self.auth_token or not self.test_chat_id:
@@ -619,6 +877,47 @@ class KriptonitAPITester:
             self.log_result("Get Chat Messages", False, "Request failed", str(e))
             return False
     
+    def test_get_chat_messages_cursors(self):
+        """Test paging chat messages with before (X-Prev-Cursor) and after"""
+        if not self.auth_token or not self.test_chat_id:
+            self.log_result("Get Chat Messages (Cursors)", False, "Missing auth token or chat ID")
+            return False
+
+        try:
+            headers = {"Authorization": f"Bearer {self.auth_token}"}
+            url = f"{self.base_url}/chats/{self.test_chat_id}/messages"
+            sent = []
+            for content in ("Сообщение для курсоров 1", "Сообщение для курсоров 2"):
+                response = requests.post(url, json={"content": content}, headers=headers, timeout=10)
+                if response.status_code != 200:
+                    self.log_result("Get Chat Messages (Cursors)", False, f"HTTP {response.status_code}", response.text)
+                    return False
+                sent.append(response.json()["id"])
+
+            response = requests.get(url, params={"limit": 2}, headers=headers, timeout=10)
+            latest = [m.get("id") for m in response.json()]
+            prev_cursor = response.headers.get("X-Prev-Cursor")
+            if response.status_code != 200 or latest != sent or not prev_cursor:
+                self.log_result("Get Chat Messages (Cursors)", False, "Latest page mismatch", {"expected": sent, "got": latest})
+                return False
+
+            response = requests.get(url, params={"before": prev_cursor}, headers=headers, timeout=10)
+            older = [m.get("id") for m in response.json()]
+            if response.status_code != 200 or not older or set(older) & set(sent):
+                self.log_result("Get Chat Messages (Cursors)", False, "before= page overlaps the latest page", older)
+                return False
+
+            response = requests.get(url, params={"after": prev_cursor}, headers=headers, timeout=10)
+            newer = [m.get("id") for m in response.json()]
+            if response.status_code != 200 or newer != sent[1:]:
+                self.log_result("Get Chat Messages (Cursors)", False, "after= page mismatch", {"expected": sent[1:], "got": newer})
+                return False
+            self.log_result("Get Chat Messages (Cursors)", True, f"before= returned {len(older)} older messages, after= the newer one")
+            return True
+        except Exception as e:
+            self.log_result("Get Chat Messages (Cursors)", False, "Request failed", str(e))
+            return False
+    
     def test_create_call_request(self):
         """Test creating a call request"""
         if not self.auth_token or not self.test_chat_id:
@@ -964,14 +1263,20 @@ class KriptonitAPITester:
             self.test_create_anonymous_user,
             self.test_get_current_user,
             self.test_get_current_user_without_token,
+            self.test_blocked_user_session_rejected,
             self.test_create_post,
             self.test_create_post_without_token,
             self.test_get_posts,
+            self.test_get_posts_cursor,
+            self.test_search_posts,
+            self.test_get_posts_by_tag,
             self.test_get_single_post,
             self.test_get_nonexistent_post,
             self.test_add_comment,
             self.test_add_comment_without_token,
             self.test_get_comments,
+            self.test_get_comments_cursor,
+            self.test_comments_conditional_get,
             self.test_create_report,
             self.test_create_report_without_token,
             self.test_validation_empty_post,
@@ -979,9 +1284,13 @@ class KriptonitAPITester:
             # Phase 4: Chat and Audio Call functionality
             self.test_create_second_anonymous_user,
             self.test_create_chat,
+            self.test_create_chat_from_both_sides,
             self.test_get_user_chats,
             self.test_send_message,
+            self.test_get_chat_inbox,
+            self.test_mark_chat_read,
             self.test_get_chat_messages,
+            self.test_get_chat_messages_cursors,
             self.test_create_call_request,
             self.test_respond_to_call_accept,
             self.test_webrtc_offer,
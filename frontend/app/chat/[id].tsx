@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useMemo } from 'react';
 import {
   View,
   Text,
@@ -42,6 +42,22 @@ interface CallRequest {
 }
 
 const API_BASE_URL = process.env.EXPO_PUBLIC_BACKEND_URL;
+// Default page size of GET /chats/{id}/messages
+const MESSAGES_PAGE_SIZE = 100;
+// Realtime updates; the token goes in the Authorization header, never in the URL
+const WS_URL = `${(API_BASE_URL || '').replace(/^http/, 'ws')}/api/ws`;
+const WS_PING_INTERVAL = 25000;
+const WS_RECONNECT_MAX_DELAY = 30000;
+
+// Messages ordered by (created_at, id), the same order the server pages in
+const byPosition = (a: Message, b: Message) =>
+  a.created_at === b.created_at ? (a.id < b.id ? -1 : 1) : (a.created_at < b.created_at ? -1 : 1);
+
+const mergeMessages = (prev: Message[], incoming: Message[]) => {
+  const known = new Set(prev.map(m => m.id));
+  const fresh = incoming.filter(m => !known.has(m.id));
+  return fresh.length > 0 ? [...prev, ...fresh].sort(byPosition) : prev;
+};
 
 // WebRTC configuration
 const pcConfig = {
@@ -66,6 +82,18 @@ export default function ChatScreen() {
   const peerConnection = useRef<RTCPeerConnection | null>(null);
   const callTimer = useRef<NodeJS.Timeout | null>(null);
   const callStartTime = useRef<Date | null>(null);
+  // Cursor of the newest loaded message, and the one before the last poll moved it.
+  // Polls start from the older one: a message stamped just before the newest one
+  // but stored a moment later is picked up by the next poll; known ids are dropped.
+  const afterCursor = useRef<string | null>(null);
+  const overlapCursor = useRef<string | null>(null);
+  const knownIds = useRef<Set<string>>(new Set());
+  // Cursor of the oldest loaded message, for "load older" (X-Prev-Cursor)
+  const beforeCursor = useRef<string | null>(null);
+  const [hasOlder, setHasOlder] = useState(false);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
+  // Id of the last message the other participant has read (X-Peer-Read-Upto)
+  const [peerReadUpto, setPeerReadUpto] = useState<string | null>(null);
 
   const getTopPadding = () => {
     if (Platform.OS === 'android') {
@@ -75,12 +103,59 @@ export default function ChatScreen() {
   };
 
   useEffect(() => {
-    if (chatId && user) {
-      fetchMessages();
-      // Set up polling for new messages every 3 seconds
-      const interval = setInterval(fetchMessages, 3000);
-      return () => clearInterval(interval);
-    }
+    if (!chatId || !user?.token) return;
+
+    afterCursor.current = null;
+    overlapCursor.current = null;
+    beforeCursor.current = null;
+    knownIds.current = new Set();
+
+    let socket: WebSocket | null = null;
+    let pingTimer: ReturnType<typeof setInterval> | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    let reconnectDelay = 1000;
+    let closed = false;
+
+    const connect = () => {
+      socket = new WebSocket(WS_URL, undefined, {
+        headers: { Authorization: `Bearer ${user.token}` },
+      });
+
+      socket.onopen = () => {
+        reconnectDelay = 1000;
+        // whatever was sent before the socket (re)connected comes through ?after=
+        catchUp();
+        pingTimer = setInterval(() => socket?.send('ping'), WS_PING_INTERVAL);
+      };
+
+      socket.onmessage = (event) => {
+        const update = JSON.parse(event.data);
+        if (update.chat_id !== chatId) return;
+        if (update.type === 'message') {
+          receiveMessages([update.message]);
+        } else if (update.type === 'read' && update.user_id !== user.id) {
+          setPeerReadUpto(update.message_id);
+        }
+      };
+
+      socket.onclose = () => {
+        if (pingTimer) clearInterval(pingTimer);
+        if (closed) return;
+        reconnectTimer = setTimeout(connect, reconnectDelay);
+        reconnectDelay = Math.min(reconnectDelay * 2, WS_RECONNECT_MAX_DELAY);
+      };
+    };
+
+    // history first, then the socket; the screen still works while it reconnects
+    fetchMessages().finally(() => {
+      if (!closed) connect();
+    });
+    return () => {
+      closed = true;
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      if (pingTimer) clearInterval(pingTimer);
+      socket?.close();
+    };
   }, [chatId, user]);
 
   useEffect(() => {
@@ -132,27 +207,125 @@ export default function ChatScreen() {
     };
   };
 
-  const fetchMessages = async () => {
-    if (!user?.token || !chatId) return;
+  // Adds messages not seen yet (from the socket, a catch-up page or our own send)
+  const receiveMessages = (incoming: Message[]) => {
+    const fresh = incoming.filter(m => !knownIds.current.has(m.id));
+    if (fresh.length === 0) return fresh;
+    fresh.forEach(m => knownIds.current.add(m.id));
+    setMessages(prev => mergeMessages(prev, fresh));
+    if (fresh.some(m => m.sender_id !== user?.id)) {
+      markChatRead();
+    }
+    return fresh;
+  };
+
+  // Pages through ?after= until the chat is caught up
+  const catchUp = async () => {
+    while (await fetchMessages()) {
+      // full page: there may be more right after it
+    }
+  };
+
+  // Returns true when the page was full, i.e. more messages may follow
+  const fetchMessages = async (): Promise<boolean> => {
+    if (!user?.token || !chatId) return false;
 
     try {
-      const response = await fetch(`${API_BASE_URL}/api/chats/${chatId}/messages`, {
+      const cursor = overlapCursor.current || afterCursor.current;
+      const query = cursor ? `?after=${encodeURIComponent(cursor)}` : '';
+      const response = await fetch(`${API_BASE_URL}/api/chats/${chatId}/messages${query}`, {
         headers: {
           'Authorization': `Bearer ${user.token}`,
         },
       });
 
       if (response.ok) {
-        const data = await response.json();
-        setMessages(data);
+        const data: Message[] = await response.json();
+        if (cursor) {
+          receiveMessages(data);
+        } else {
+          data.forEach(m => knownIds.current.add(m.id));
+          setMessages(data);
+          beforeCursor.current = response.headers.get('X-Prev-Cursor');
+          setHasOlder(data.length >= MESSAGES_PAGE_SIZE);
+          if (data.some(m => m.sender_id !== user.id)) {
+            markChatRead();
+          }
+        }
+        const nextCursor = response.headers.get('X-Next-Cursor');
+        const full = data.length >= MESSAGES_PAGE_SIZE;
+        if (nextCursor && nextCursor !== afterCursor.current) {
+          // full page: more is waiting right after it, so no overlap for the next request
+          overlapCursor.current = full ? null : afterCursor.current;
+          afterCursor.current = nextCursor;
+        }
+        const peerRead = response.headers.get('X-Peer-Read-Upto');
+        if (peerRead) {
+          setPeerReadUpto(peerRead);
+        }
+        return full && Boolean(cursor);
       }
     } catch (error) {
       console.error('Error fetching messages:', error);
     } finally {
       setIsLoading(false);
     }
+    return false;
+  };
+
+  const fetchOlderMessages = async () => {
+    if (!user?.token || !chatId || !beforeCursor.current || isLoadingOlder) return;
+
+    setIsLoadingOlder(true);
+    try {
+      const response = await fetch(
+        `${API_BASE_URL}/api/chats/${chatId}/messages?before=${encodeURIComponent(beforeCursor.current)}`,
+        {
+          headers: {
+            'Authorization': `Bearer ${user.token}`,
+          },
+        }
+      );
+
+      if (response.ok) {
+        const data: Message[] = await response.json();
+        data.forEach(m => knownIds.current.add(m.id));
+        setMessages(prev => mergeMessages(prev, data));
+        const prevCursor = response.headers.get('X-Prev-Cursor');
+        if (prevCursor) {
+          beforeCursor.current = prevCursor;
+        }
+        setHasOlder(data.length >= MESSAGES_PAGE_SIZE);
+      }
+    } catch (error) {
+      console.error('Error fetching older messages:', error);
+    } finally {
+      setIsLoadingOlder(false);
+    }
+  };
+
+  // One request moves our read watermark to the newest message of the chat
+  const markChatRead = async () => {
+    if (!user?.token || !chatId) return;
+
+    try {
+      await fetch(`${API_BASE_URL}/api/chats/${chatId}/read`, {
+        method: 'POST',
+        headers: {
+          'Authorization': `Bearer ${user.token}`,
+        },
+      });
+    } catch (error) {
+      console.error('Error marking chat as read:', error);
+    }
   };
 
+  // Own messages up to the other participant's watermark are read
+  const readIds = useMemo(() => {
+    const index = peerReadUpto ? messages.findIndex(m => m.id === peerReadUpto) : -1;
+    return new Set(messages.slice(0, index + 1).map(m => m.id));
+  }, [messages, peerReadUpto]);
+
   const sendMessage = async () => {
     if (!newMessage.trim() || !user?.token || isSending) return;
 
@@ -172,7 +345,8 @@ export default function ChatScreen() {
 
       if (response.ok) {
         setNewMessage('');
-        fetchMessages();
+        // the socket delivers it too; whichever comes first wins
+        receiveMessages([await response.json()]);
       }
     } catch (error) {
       console.error('Error sending message:', error);
@@ -323,6 +497,13 @@ export default function ChatScreen() {
             isOwnMessage ? styles.ownMessageTime : styles.otherMessageTime
           ]}>
             {formatMessageTime(item.created_at)}
+            {isOwnMessage && (
+              <Ionicons
+                name={item.is_read || readIds.has(item.id) ? 'checkmark-done' : 'checkmark'}
+                size={12}
+                color="rgba(0,0,0,0.6)"
+              />
+            )}
           </Text>
         </View>
       </View>
@@ -385,6 +566,20 @@ export default function ChatScreen() {
           contentContainerStyle={styles.messagesContent}
           showsVerticalScrollIndicator={false}
           inverted
+          ListHeaderComponent={hasOlder ? (
+            <TouchableOpacity
+              style={styles.loadOlderButton}
+              onPress={fetchOlderMessages}
+              disabled={isLoadingOlder}
+              activeOpacity={0.7}
+            >
+              {isLoadingOlder ? (
+                <ActivityIndicator size="small" color="#4ecdc4" />
+              ) : (
+                <Text style={styles.loadOlderText}>Загрузить ранние сообщения</Text>
+              )}
+            </TouchableOpacity>
+          ) : null}
         />
 
         {/* Message Input */}
@@ -478,6 +673,18 @@ const styles = StyleSheet.create({
   messageContainer: {
     marginBottom: 16,
   },
+  loadOlderButton: {
+    alignSelf: 'center',
+    paddingHorizontal: 16,
+    paddingVertical: 8,
+    marginBottom: 16,
+    borderRadius: 16,
+    backgroundColor: '#1a1a1a',
+  },
+  loadOlderText: {
+    fontSize: 14,
+    color: '#4ecdc4',
+  },
   ownMessage: {
     alignItems: 'flex-end',
   },
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import {
   View,
   Text,
@@ -44,6 +44,9 @@ export default function PostDetail() {
   const { id } = useLocalSearchParams<{ id: string }>();
   const [post, setPost] = useState<Post | null>(null);
   const [comments, setComments] = useState<Comment[]>([]);
+  const [commentsCursor, setCommentsCursor] = useState<string | null>(null);
+  const [isLoadingMoreComments, setIsLoadingMoreComments] = useState(false);
+  const commentsCursorRef = useRef<string | null>(null);
   const [newComment, setNewComment] = useState('');
   const [isLoading, setIsLoading] = useState(true);
   const [isSubmittingComment, setIsSubmittingComment] = useState(false);
@@ -83,18 +86,49 @@ export default function PostDetail() {
     }
   };
 
+  const updateCommentsCursor = (cursor: string | null) => {
+    commentsCursorRef.current = cursor;
+    setCommentsCursor(cursor);
+  };
+
+  // Comments come in pages ordered oldest first; X-Next-Cursor points to the next page
   const fetchComments = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/api/posts/${id}/comments`);
       if (response.ok) {
         const data = await response.json();
         setComments(data);
+        updateCommentsCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error('Error fetching comments:', error);
     }
   };
 
+  const loadMoreComments = async () => {
+    const cursor = commentsCursorRef.current;
+    if (!cursor || isLoadingMoreComments) return;
+
+    setIsLoadingMoreComments(true);
+    try {
+      const response = await fetch(
+        `${API_BASE_URL}/api/posts/${id}/comments?cursor=${encodeURIComponent(cursor)}`
+      );
+      if (response.ok) {
+        const data: Comment[] = await response.json();
+        setComments(prev => {
+          const known = new Set(prev.map(c => c.id));
+          return [...prev, ...data.filter(c => !known.has(c.id))];
+        });
+        updateCommentsCursor(response.headers.get('X-Next-Cursor'));
+      }
+    } catch (error) {
+      console.error('Error fetching more comments:', error);
+    } finally {
+      setIsLoadingMoreComments(false);
+    }
+  };
+
   const handleAddComment = async () => {
     if (!newComment.trim()) {
       Alert.alert('Ошибка', 'Введите текст комментария');
@@ -121,8 +155,12 @@ export default function PostDetail() {
       });
 
       if (response.ok) {
+        const created: Comment = await response.json();
         setNewComment('');
-        fetchComments();
+        // Newest comments are on the last page; append only if it is already loaded
+        if (!commentsCursorRef.current) {
+          setComments(prev => [...prev, created]);
+        }
         // Update comments count in post
         if (post) {
           setPost({ ...post, comments_count: post.comments_count + 1 });
@@ -345,6 +383,22 @@ export default function PostDetail() {
                 </View>
               ))
             )}
+
+            {commentsCursor && (
+              <TouchableOpacity
+                style={styles.loadMoreButton}
+                onPress={loadMoreComments}
+                disabled={isLoadingMoreComments}
+              >
+                {isLoadingMoreComments ? (
+                  <ActivityIndicator size="small" color="#666" />
+                ) : (
+                  <Text style={styles.loadMoreText}>
+                    Показать ещё{post ? ` (${Math.max(post.comments_count - comments.length, 0)})` : ''}
+                  </Text>
+                )}
+              </TouchableOpacity>
+            )}
           </View>
         </ScrollView>
 
@@ -546,6 +600,14 @@ const styles = StyleSheet.create({
     fontSize: 12,
     color: '#666',
   },
+  loadMoreButton: {
+    paddingVertical: 12,
+    alignItems: 'center',
+  },
+  loadMoreText: {
+    fontSize: 14,
+    color: '#888',
+  },
   commentInputContainer: {
     flexDirection: 'row',
     alignItems: 'flex-end',
@@ -14,12 +14,21 @@ import { Ionicons } from '@expo/vector-icons';
 import { router } from 'expo-router';
 import { useAuth } from '../../contexts/AuthContext';
 
-interface Chat {
+interface LastMessage {
   id: string;
-  participants: string[];
+  sender_id: string;
+  sender_display_name: string;
+  content: string;
   created_at: string;
+}
+
+interface Chat {
+  id: string;
+  other_participant_id: string | null;
+  other_participant_name: string | null;
+  last_message: LastMessage | null;
   last_message_at: string;
-  is_active: boolean;
+  unread_count: number;
 }
 
 const API_BASE_URL = process.env.EXPO_PUBLIC_BACKEND_URL;
@@ -40,7 +49,7 @@ export default function ChatsTab() {
     if (!user?.token) return;
 
     try {
-      const response = await fetch(`${API_BASE_URL}/api/chats`, {
+      const response = await fetch(`${API_BASE_URL}/api/chats/inbox`, {
         headers: {
           'Authorization': `Bearer ${user.token}`,
         },
@@ -90,14 +99,25 @@ export default function ChatsTab() {
       </View>
       
       <View style={styles.chatInfo}>
-        <Text style={styles.chatTitle}>Анонимный диалог</Text>
-        <Text style={styles.chatSubtitle}>
-          Последняя активность: {formatDate(item.last_message_at)}
+        <Text style={styles.chatTitle} numberOfLines={1}>
+          {item.other_participant_name || 'Анонимный диалог'}
+        </Text>
+        <Text style={styles.chatSubtitle} numberOfLines={1}>
+          {item.last_message
+            ? `${item.last_message.sender_id === user?.id ? 'Вы: ' : ''}${item.last_message.content}`
+            : 'Нет сообщений'}
         </Text>
       </View>
       
       <View style={styles.chatMeta}>
-        <Ionicons name="chevron-forward" size={20} color="#666" />
+        <Text style={styles.chatTime}>{formatDate(item.last_message_at)}</Text>
+        {item.unread_count > 0 ? (
+          <View style={styles.unreadBadge}>
+            <Text style={styles.unreadText}>{item.unread_count > 99 ? '99+' : item.unread_count}</Text>
+          </View>
+        ) : (
+          <Ionicons name="chevron-forward" size={20} color="#666" />
+        )}
       </View>
     </TouchableOpacity>
   );
@@ -202,8 +222,28 @@ const styles = StyleSheet.create({
     color: '#666',
   },
   chatMeta: {
+    alignItems: 'flex-end',
+    marginLeft: 12,
+  },
+  chatTime: {
+    fontSize: 12,
+    color: '#666',
+    marginBottom: 6,
+  },
+  unreadBadge: {
+    minWidth: 20,
+    height: 20,
+    borderRadius: 10,
+    paddingHorizontal: 6,
+    backgroundColor: '#4ecdc4',
+    justifyContent: 'center',
     alignItems: 'center',
   },
+  unreadText: {
+    fontSize: 12,
+    fontWeight: '600',
+    color: '#0c0c0c',
+  },
   emptyState: {
     flex: 1,
     justifyContent: 'center',
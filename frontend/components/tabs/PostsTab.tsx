@@ -4,6 +4,7 @@ import {
   Text,
   StyleSheet,
   FlatList,
+  ScrollView,
   TouchableOpacity,
   RefreshControl,
   Alert,
@@ -26,21 +27,33 @@ interface Post {
   comments_count: number;
 }
 
+interface TagCount {
+  tag: string;
+  count: number;
+}
+
 const API_BASE_URL = process.env.EXPO_PUBLIC_BACKEND_URL;
 
 export default function PostsTab() {
   const [posts, setPosts] = useState<Post[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
+  const [popularTags, setPopularTags] = useState<TagCount[]>([]);
+  const [selectedTag, setSelectedTag] = useState<string | null>(null);
   const { isAuthenticated } = useAuth();
 
   useEffect(() => {
-    fetchPosts();
+    fetchPopularTags();
   }, []);
 
+  useEffect(() => {
+    fetchPosts();
+  }, [selectedTag]);
+
   const fetchPosts = async () => {
     try {
-      const response = await fetch(`${API_BASE_URL}/api/posts`);
+      const query = selectedTag ? `?tag=${encodeURIComponent(selectedTag)}` : '';
+      const response = await fetch(`${API_BASE_URL}/api/posts${query}`);
       if (response.ok) {
         const data = await response.json();
         setPosts(data);
@@ -53,9 +66,21 @@ export default function PostsTab() {
     }
   };
 
+  // Counts are precomputed on the backend, so this is a single cheap request
+  const fetchPopularTags = async () => {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/tags/popular`);
+      if (response.ok) {
+        setPopularTags(await response.json());
+      }
+    } catch (error) {
+      console.error('Error fetching popular tags:', error);
+    }
+  };
+
   const onRefresh = async () => {
     setRefreshing(true);
-    await fetchPosts();
+    await Promise.all([fetchPosts(), fetchPopularTags()]);
     setRefreshing(false);
   };
 
@@ -94,9 +119,9 @@ export default function PostsTab() {
       {item.tags.length > 0 && (
         <View style={styles.tagsContainer}>
           {item.tags.slice(0, 3).map((tag, index) => (
-            <View key={index} style={styles.tag}>
+            <TouchableOpacity key={index} style={styles.tag} onPress={() => setSelectedTag(tag)}>
               <Text style={styles.tagText}>#{tag}</Text>
-            </View>
+            </TouchableOpacity>
           ))}
         </View>
       )}
@@ -148,6 +173,33 @@ export default function PostsTab() {
         </TouchableOpacity>
       </View>
 
+      {popularTags.length > 0 && (
+        <ScrollView
+          horizontal
+          style={styles.tagFilter}
+          contentContainerStyle={styles.tagFilterContent}
+          showsHorizontalScrollIndicator={false}
+        >
+          <TouchableOpacity
+            style={[styles.tag, !selectedTag && styles.tagSelected]}
+            onPress={() => setSelectedTag(null)}
+          >
+            <Text style={[styles.tagText, !selectedTag && styles.tagTextSelected]}>Все</Text>
+          </TouchableOpacity>
+          {popularTags.map(({ tag, count }) => (
+            <TouchableOpacity
+              key={tag}
+              style={[styles.tag, selectedTag === tag && styles.tagSelected]}
+              onPress={() => setSelectedTag(selectedTag === tag ? null : tag)}
+            >
+              <Text style={[styles.tagText, selectedTag === tag && styles.tagTextSelected]}>
+                #{tag} · {count}
+              </Text>
+            </TouchableOpacity>
+          ))}
+        </ScrollView>
+      )}
+
       <FlatList
         data={posts}
         renderItem={renderPost}
@@ -255,6 +307,21 @@ const styles = StyleSheet.create({
     fontSize: 12,
     color: '#4ecdc4',
   },
+  tagSelected: {
+    backgroundColor: '#4ecdc4',
+  },
+  tagTextSelected: {
+    color: '#0c0c0c',
+  },
+  tagFilter: {
+    flexGrow: 0,
+    borderBottomWidth: 1,
+    borderBottomColor: '#333',
+  },
+  tagFilterContent: {
+    paddingHorizontal: 16,
+    paddingVertical: 8,
+  },
   postFooter: {
     flexDirection: 'row',
     justifyContent: 'space-between',
@@ -0,0 +1,60 @@
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from post_search import PostSearchIndex  # noqa: E402
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_post(content, minutes, title="Пост"):
+    return {"id": uuid4(), "title": title, "content": content, "tags": [],
+            "created_at": START + timedelta(minutes=minutes)}
+
+
+def make_index(posts):
+    index = PostSearchIndex()
+    for post in posts:
+        index.add(post)
+    index.ready = True
+    return index
+
+
+def page_through(index, query, limit, after=None):
+    found = []
+    while True:
+        page = index.search(query, limit, after)
+        if not page:
+            return found
+        found.extend(post_id for _, post_id in page)
+        after = page[-1]
+
+
+def test_prefix_matches_every_term():
+    # сотня разных слов на «про» раньше «прохладного» по алфавиту
+    posts = [make_post(f"про{chr(0x430 + i % 20)}{chr(0x430 + i // 20)}ка", i) for i in range(100)]
+    target = make_post("Сегодня прохладный вечер", 1000)
+    index = make_index(posts + [target])
+    assert target["id"] in {post_id for _, post_id in index.search("про", 200)}
+    assert [post_id for _, post_id in index.search("вечер про", 10)] == [target["id"]]
+
+
+def test_short_prefix_is_ignored():
+    index = make_index([make_post("прохладный вечер", 0)])
+    assert index.search("пр", 10) == []
+
+
+def test_cursor_is_stable_while_index_grows():
+    posts = [make_post(f"прогулка номер {i}", i) for i in range(30)]
+    index = make_index(posts)
+    first = index.search("прогул", 10)
+    # между страницами появляются новые посты, в том числе с новыми термами на тот же префикс
+    for i in range(20):
+        index.add(make_post(f"прогулочный маршрут {i}", 100 + i))
+    rest = page_through(index, "прогул", 10, first[-1])
+    seen = [post_id for _, post_id in first] + rest
+    assert len(seen) == len(set(seen))
+    assert set(seen) == {post["id"] for post in posts}